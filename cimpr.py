@@ -7,15 +7,22 @@ Components: Orchestrator → Discoverer → Classifier → Executor → Analyzer
 """
 import asyncio
 import json
+import logging
+import logging.handlers
+import queue
+import sys
 import base64
+import orjson
 import hashlib
+import atexit
+import time
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, Dict, List, Any, Tuple, Set
 from urllib.parse import urlparse
 from enum import Enum
 from dataclasses import dataclass, asdict
-from collections import deque
+from collections import deque, OrderedDict
 import os
 from playwright.async_api import async_playwright, Page, Locator, BrowserContext
 from openai import OpenAI
@@ -24,6 +31,27 @@ import os
 
 load_dotenv()
 
+
+def _setup_logging() -> logging.Logger:
+    """Route exploration output through a queue so stdout writes happen off the event loop"""
+    log = logging.getLogger("semantic_explorer")
+    log.setLevel(os.getenv("EXPLORER_LOG_LEVEL", "INFO").upper())
+    log.propagate = False
+    
+    if not log.handlers:
+        log_queue = queue.SimpleQueue()
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(logging.Formatter("%(message)s"))
+        listener = logging.handlers.QueueListener(log_queue, stream_handler)
+        listener.start()
+        atexit.register(listener.stop)
+        log.addHandler(logging.handlers.QueueHandler(log_queue))
+    
+    return log
+
+
+logger = _setup_logging()
+
 # ═══════════════════════════════════════════════════════════════
 #  DATA STRUCTURES
 # ═══════════════════════════════════════════════════════════════
@@ -142,7 +170,7 @@ class StateFingerprinter:
             return hashlib.sha256(normalized.encode()).hexdigest()[:16]
             
         except Exception as e:
-            print(f"    ⚠️ State fingerprint failed: {e}")
+            logger.warning(f"    ⚠️ State fingerprint failed: {e}")
             return "unknown_state"
 
 
@@ -159,27 +187,44 @@ class ElementDiscoverer:
     async def discover_elements(self, page: Page, goal: str, current_depth: int) -> List[Dict]:
         """Complete discovery process"""
         
-        print("\n  🔍 ELEMENT DISCOVERY")
+        elements, screenshot_b64 = await self.scan_page(page)
+        return await self.prioritize(elements, goal, screenshot_b64)
+    
+    async def scan_page(self, page: Page) -> Tuple[List[Dict], str]:
+        """Page-touching half of discovery: DOM scans plus a context screenshot"""
+        
+        logger.info("\n  🔍 ELEMENT DISCOVERY")
         
         # Phase 1: Static scan
         static_elements = await self._static_scan(page)
-        print(f"    Static scan: {len(static_elements)} elements")
+        logger.info(f"    Static scan: {len(static_elements)} elements")
         
         # Phase 2: Hover scan (sample-based)
         hover_elements = await self._hover_scan(page, sample_size=3)
-        print(f"    Hover scan: {len(hover_elements)} elements")
+        logger.info(f"    Hover scan: {len(hover_elements)} elements")
         
         # Phase 3: Virtualization detection
         virtual_templates = await self._detect_virtualization(page)
-        print(f"    Virtual templates: {len(virtual_templates)}")
+        logger.info(f"    Virtual templates: {len(virtual_templates)}")
         
         # Combine all elements
         all_elements = static_elements + hover_elements + virtual_templates
         
+        # Take screenshot for context
+        screenshot_b64 = ""
+        if all_elements:
+            screenshot_bytes = await page.screenshot()
+            screenshot_b64 = base64.b64encode(screenshot_bytes).decode()
+        
+        return all_elements, screenshot_b64
+    
+    async def prioritize(self, elements: List[Dict], goal: str, screenshot_b64: str) -> List[Dict]:
+        """LLM half of discovery; does not touch the page"""
+        
         # Phase 4: LLM prioritization
-        prioritized = await self._prioritize_with_llm(all_elements, goal, page)
+        prioritized = await self._prioritize_with_llm(elements, goal, screenshot_b64)
         
-        print(f"    ✓ Total discovered: {len(prioritized)}")
+        logger.info(f"    ✓ Total discovered: {len(prioritized)}")
         return prioritized
     
     async def _static_scan(self, page: Page) -> List[Dict]:
@@ -333,7 +378,7 @@ class ElementDiscoverer:
                     continue
             
         except Exception as e:
-            print(f"    Hover scan error: {e}")
+            logger.warning(f"    Hover scan error: {e}")
         
         return hover_elements
     
@@ -374,16 +419,12 @@ class ElementDiscoverer:
         
         return templates
     
-    async def _prioritize_with_llm(self, elements: List[Dict], goal: str, page: Page) -> List[Dict]:
+    async def _prioritize_with_llm(self, elements: List[Dict], goal: str, screenshot_b64: str) -> List[Dict]:
         """Use LLM to prioritize elements based on goal"""
         
         if not elements:
             return []
         
-        # Take screenshot for context
-        screenshot_bytes = await page.screenshot()
-        screenshot_b64 = base64.b64encode(screenshot_bytes).decode()
-        
         # Prepare elements summary
         elements_summary = [
             {
@@ -404,7 +445,9 @@ Return ONLY JSON array with same length as input:
 [{{"label": "...", "priority": 1}}, ...]"""
 
         try:
-            response = self.openai.chat.completions.create(
+            # Run the blocking client in a thread so page work can overlap the call
+            response = await asyncio.to_thread(
+                self.openai.chat.completions.create,
                 model="gpt-4o-mini",
                 messages=[{
                     "role": "user",
@@ -427,7 +470,7 @@ Return ONLY JSON array with same length as input:
                 el['priority'] = priority_map.get(el.get('label', ''), 5)
             
         except Exception as e:
-            print(f"    LLM prioritization failed: {e}")
+            logger.warning(f"    LLM prioritization failed: {e}")
             # Default priorities
             for el in elements:
                 el['priority'] = 5
@@ -572,7 +615,7 @@ class InteractionExecutor:
             
         except Exception as e:
             error = str(e)
-            print(f"    ❌ Execution failed: {e}")
+            logger.warning(f"    ❌ Execution failed: {e}")
         
         # Capture after state
         state_after = await self.fingerprinter.get_state_hash(self.page)
@@ -725,7 +768,8 @@ Return ONLY JSON:
 {{"pattern": "HIERARCHICAL|FORM|MODAL|NO_CHANGE|ERROR", "metadata": {{}}}}"""
 
         try:
-            response = self.openai.chat.completions.create(
+            response = await asyncio.to_thread(
+                self.openai.chat.completions.create,
                 model="gpt-4o-mini",
                 messages=[{
                     "role": "user",
@@ -750,7 +794,7 @@ Return ONLY JSON:
             }
             
         except Exception as e:
-            print(f"    Pattern analysis failed: {e}")
+            logger.warning(f"    Pattern analysis failed: {e}")
             return {
                 'pattern': PatternType.NO_CHANGE,
                 'metadata': {}
@@ -777,12 +821,14 @@ class Orchestrator:
     """Main controller coordinating all components"""
     
     def __init__(self, openai_api_key: str, goal: str, safety_mode: SafetyMode,
-                 max_depth: int = 10, max_elements: int = 200):
+                 max_depth: int = 10, max_elements: int = 200,
+                 history_limit: int = 50, min_iteration_interval: float = 0.0):
         self.openai = OpenAI(api_key=openai_api_key)
         self.goal = goal
         self.safety_mode = safety_mode
         self.max_depth = max_depth
         self.max_elements = max_elements
+        self.min_iteration_interval = min_iteration_interval  # Rate limit against the target server
         
         # Components
         self.fingerprinter = StateFingerprinter()
@@ -792,24 +838,35 @@ class Orchestrator:
         # State
         self.element_tree: Dict[str, ElementNode] = {}
         self.exploration_queue: deque = deque()
-        self.visited_states: Set[str] = set()
-        self.interaction_history: List[Dict] = []
+        self.visited_states: OrderedDict = OrderedDict()  # 64-bit state key -> None, LRU order
+        self.max_visited_states = 10000
+        self.interaction_history: deque = deque(maxlen=history_limit)  # Only the tail is reported
+        self.interactions_recorded = 0
         self.elements_explored = 0
         self.current_depth = 0
+        self._save_task: Optional[asyncio.Task] = None
+        self._save_dirty = False
+        
+        # Discovery prefetch: held by whoever is mutating / scanning the page
+        self._page_lock = asyncio.Lock()
+        self._prefetch_task: Optional[asyncio.Task] = None
         
         # Session
         self.session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.output_dir = Path('exploration_output')
         self.output_dir.mkdir(exist_ok=True)
         
-        print(f"\n{'='*80}")
-        print("🧠 SEMANTIC WEB EXPLORER - PRODUCTION ARCHITECTURE")
-        print(f"{'='*80}")
-        print(f"Goal: {goal}")
-        print(f"Safety Mode: {safety_mode.value}")
-        print(f"Max Depth: {max_depth}")
-        print(f"Session: {self.session_id}")
-        print(f"{'='*80}\n")
+        self.log = logger
+        self.log.info(
+            f"\n{'='*80}\n"
+            "🧠 SEMANTIC WEB EXPLORER - PRODUCTION ARCHITECTURE\n"
+            f"{'='*80}\n"
+            f"Goal: {goal}\n"
+            f"Safety Mode: {safety_mode.value}\n"
+            f"Max Depth: {max_depth}\n"
+            f"Session: {self.session_id}\n"
+            f"{'='*80}\n"
+        )
     
     async def explore(self, page: Page):
         """Main exploration loop"""
@@ -822,10 +879,10 @@ class Orchestrator:
         
         while iteration < max_iterations:
             iteration += 1
+            iteration_started = time.monotonic()
             
-            print(f"\n{'='*60}")
-            print(f"ITERATION {iteration}")
-            print(f"{'='*60}")
+            if self.log.isEnabledFor(logging.DEBUG):
+                self.log.debug(f"\n{'='*60}\nITERATION {iteration}\n{'='*60}")
             
             # Check stopping conditions
             if await self._check_stopping_conditions():
@@ -835,38 +892,47 @@ class Orchestrator:
             element = await self._get_next_element(page)
             
             if not element:
-                print("\n✅ Exploration complete - no more elements")
+                self.log.info("\n✅ Exploration complete - no more elements")
                 break
             
-            print(f"\n  🎯 Target: {element.get('label', 'unknown')} ({element.get('element_type', 'unknown')})")
+            self.log.info(f"\n  🎯 Target: {element.get('label', 'unknown')} ({element.get('element_type', 'unknown')})")
             
             # Safety check
             safety_check = await ActionClassifier.classify_action(element, self.safety_mode)
             
             if not safety_check['allowed']:
-                print(f"  🚫 Blocked: {safety_check['reason']}")
+                self.log.info(f"  🚫 Blocked: {safety_check['reason']}")
                 self.elements_explored += 1
                 continue
             
-            print(f"  ✓ Safety: {safety_check['classification'].value}")
+            self.log.info(f"  ✓ Safety: {safety_check['classification'].value}")
+            
+            # Queue drained: discover the next batch while this element executes
+            if not self.exploration_queue and self._prefetch_task is None:
+                self._prefetch_task = asyncio.create_task(self._prefetch_next(page))
             
             # Execute interaction
-            print(f"  ⚡ Executing...")
-            result = await self.executor.execute(element, safety_check['special_handling'])
+            self.log.info(f"  ⚡ Executing...")
+            async with self._page_lock:
+                result = await self.executor.execute(element, safety_check['special_handling'])
             
             if not result.success:
-                print(f"  ❌ Failed: {result.error}")
+                self.log.warning(f"  ❌ Failed: {result.error}")
                 self.elements_explored += 1
                 continue
             
-            print(f"  ✓ Success ({result.execution_time:.1f}s)")
+            self.log.info(f"  ✓ Success ({result.execution_time:.1f}s)")
             
             # Analyze result
-            print(f"  🔍 Analyzing pattern...")
+            self.log.info(f"  🔍 Analyzing pattern...")
             analysis = await self.analyzer.analyze(result, element)
             pattern = analysis['pattern']
             
-            print(f"  📊 Pattern: {pattern.value}")
+            self.log.info(f"  📊 Pattern: {pattern.value}")
+            
+            # Prefetched elements only describe the page if nothing changed
+            if pattern != PatternType.NO_CHANGE:
+                await self._cancel_prefetch()
             
             # Handle pattern
             await self._handle_pattern(pattern, analysis, result, page)
@@ -877,31 +943,50 @@ class Orchestrator:
             
             # Save progress
             if iteration % 10 == 0:
-                self._save_progress()
+                self._schedule_progress_save()
             
-            await asyncio.sleep(0.5)
-        
-        print(f"\n{'='*60}")
-        print(f"🏁 EXPLORATION COMPLETE")
-        print(f"{'='*60}")
-        print(f"Elements explored: {self.elements_explored}")
-        print(f"Iterations: {iteration}")
-        print(f"{'='*60}\n")
+            if self.min_iteration_interval > 0:
+                remaining = self.min_iteration_interval - (time.monotonic() - iteration_started)
+                if remaining > 0:
+                    await asyncio.sleep(remaining)
+        
+        await self._cancel_prefetch()
+        
+        if self._save_task is not None:
+            await self._save_task
+        
+        self.log.info(
+            f"\n{'='*60}\n"
+            "🏁 EXPLORATION COMPLETE\n"
+            f"{'='*60}\n"
+            f"Elements explored: {self.elements_explored}\n"
+            f"Iterations: {iteration}\n"
+            f"{'='*60}\n"
+        )
         
-        self._save_final_report()
+        await asyncio.to_thread(self._save_final_report)
     
     async def _get_next_element(self, page: Page) -> Optional[Dict]:
         """Get next element to explore"""
         
         # If queue empty, discover new elements
         if len(self.exploration_queue) == 0:
-            print("\n  🔍 Discovery phase...")
+            self.log.info("\n  🔍 Discovery phase...")
             
-            elements = await self.discoverer.discover_elements(
-                page, 
-                self.goal, 
-                self.current_depth
-            )
+            elements = None
+            if self._prefetch_task is not None:
+                task, self._prefetch_task = self._prefetch_task, None
+                try:
+                    elements = await task
+                except Exception as e:
+                    self.log.warning(f"    Prefetch failed, rediscovering: {e}")
+            
+            if elements is None:
+                elements = await self.discoverer.discover_elements(
+                    page, 
+                    self.goal, 
+                    self.current_depth
+                )
             
             # Add to queue
             for el in elements:
@@ -913,6 +998,23 @@ class Orchestrator:
         # Get next from queue
         return self.exploration_queue.popleft()
     
+    async def _prefetch_next(self, page: Page) -> List[Dict]:
+        """Discover the next batch; the page scan waits for the executor, the LLM call does not"""
+        async with self._page_lock:
+            elements, screenshot_b64 = await self.discoverer.scan_page(page)
+        return await self.discoverer.prioritize(elements, self.goal, screenshot_b64)
+    
+    async def _cancel_prefetch(self):
+        """Drop an in-flight prefetch whose view of the page is stale"""
+        if self._prefetch_task is None:
+            return
+        task, self._prefetch_task = self._prefetch_task, None
+        task.cancel()
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
+    
     async def _handle_pattern(self, pattern: PatternType, analysis: Dict, 
                               result: InteractionResult, page: Page):
         """Handle different interaction patterns"""
@@ -920,24 +1022,28 @@ class Orchestrator:
         if pattern == PatternType.NAVIGATION:
             # Check if we've visited this page
             state_hash = result.state_hash_after
-            if state_hash in self.visited_states:
-                print("    ↺ Already visited this page")
+            if self._is_visited(state_hash):
+                self.log.info("    ↺ Already visited this page")
                 await page.go_back()
                 await asyncio.sleep(1)
             else:
-                self.visited_states.add(state_hash)
-                print("    ✓ New page, continuing exploration")
+                self._mark_visited(state_hash)
+                self.log.info("    ✓ New page, continuing exploration")
+                try:
+                    await page.wait_for_load_state('domcontentloaded', timeout=5000)
+                except:
+                    pass
         
         elif pattern == PatternType.HIERARCHICAL:
-            print("    → Hierarchical pattern detected")
+            self.log.info("    → Hierarchical pattern detected")
             # Discover new child elements
             new_elements = await self.discoverer.discover_elements(page, self.goal, self.current_depth + 1)
             for el in new_elements[:5]:  # Limit children
                 self.exploration_queue.append(el)
-            print(f"    + Added {len(new_elements[:5])} child elements")
+            self.log.info(f"    + Added {len(new_elements[:5])} child elements")
         
         elif pattern == PatternType.FORM:
-            print("    → Form detected")
+            self.log.info("    → Form detected")
             # For now, skip form filling (can add form handler later)
             # Close form if possible
             try:
@@ -949,7 +1055,7 @@ class Orchestrator:
                 pass
         
         elif pattern == PatternType.MODAL:
-            print("    → Modal detected")
+            self.log.info("    → Modal detected")
             # Close modal
             try:
                 cancel = await self.executor._find_cancel_button()
@@ -959,15 +1065,37 @@ class Orchestrator:
             except:
                 pass
     
+    @staticmethod
+    def _state_key(state_hash: str) -> int:
+        """Truncate a state hash to a 64-bit integer key"""
+        try:
+            return int(state_hash[:16], 16)
+        except ValueError:
+            return hash(state_hash) & 0xFFFFFFFFFFFFFFFF
+    
+    def _is_visited(self, state_hash: str) -> bool:
+        """Check (and refresh) a state in the bounded visited-state LRU"""
+        key = self._state_key(state_hash)
+        if key in self.visited_states:
+            self.visited_states.move_to_end(key)
+            return True
+        return False
+    
+    def _mark_visited(self, state_hash: str):
+        """Add a state to the visited-state LRU, evicting the oldest entry if full"""
+        self.visited_states[self._state_key(state_hash)] = None
+        if len(self.visited_states) > self.max_visited_states:
+            self.visited_states.popitem(last=False)
+    
     async def _check_stopping_conditions(self) -> bool:
         """Check if we should stop exploring"""
         
         if self.elements_explored >= self.max_elements:
-            print(f"\n🛑 Max elements reached ({self.max_elements})")
+            self.log.info(f"\n🛑 Max elements reached ({self.max_elements})")
             return True
         
         if self.current_depth >= self.max_depth:
-            print(f"\n🛑 Max depth reached ({self.max_depth})")
+            self.log.info(f"\n🛑 Max depth reached ({self.max_depth})")
             return True
         
         return False
@@ -975,6 +1103,7 @@ class Orchestrator:
     def _record_interaction(self, element: Dict, result: InteractionResult, analysis: Dict):
         """Record interaction in history"""
         
+        self.interactions_recorded += 1
         self.interaction_history.append({
             'step': self.elements_explored,
             'element': element,
@@ -984,20 +1113,39 @@ class Orchestrator:
                 'state_changed': result.state_hash_before != result.state_hash_after,
                 'execution_time': result.execution_time
             },
-            'timestamp': datetime.now().isoformat()
+            'timestamp': time.time()  # Rendered as ISO when the report is written
         })
     
+    def _schedule_progress_save(self):
+        """Save progress in the background; a request made mid-write is coalesced into one rerun"""
+        if self._save_task is not None and not self._save_task.done():
+            self._save_dirty = True
+            return
+        self._save_task = asyncio.create_task(self._flush_progress())
+    
+    async def _flush_progress(self):
+        """Write progress off the event loop until no newer save was requested"""
+        while True:
+            self._save_dirty = False
+            try:
+                await asyncio.to_thread(self._save_progress)
+            except Exception as e:
+                # A lost progress snapshot must not abort exploration or the final report
+                self.log.warning(f"  ⚠️ Progress save failed: {e}")
+                break
+            if not self._save_dirty:
+                break
+    
     def _save_progress(self):
         """Save current progress"""
         progress_file = self.output_dir / f"progress_{self.session_id}.json"
         
-        with open(progress_file, 'w') as f:
-            json.dump({
-                'session_id': self.session_id,
-                'elements_explored': self.elements_explored,
-                'queue_size': len(self.exploration_queue),
-                'history_size': len(self.interaction_history)
-            }, f, indent=2)
+        progress_file.write_bytes(orjson.dumps({
+            'session_id': self.session_id,
+            'elements_explored': self.elements_explored,
+            'queue_size': len(self.exploration_queue),
+            'history_size': self.interactions_recorded
+        }, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
     
     def _save_final_report(self):
         """Save final exploration report"""
@@ -1008,17 +1156,123 @@ class Orchestrator:
             'safety_mode': self.safety_mode.value,
             'summary': {
                 'total_elements': self.elements_explored,
-                'total_interactions': len(self.interaction_history),
+                'total_interactions': self.interactions_recorded,
                 'unique_states': len(self.visited_states)
             },
-            'history': self.interaction_history[-50:]  # Last 50
+            'history': [
+                {**entry, 'timestamp': datetime.fromtimestamp(entry['timestamp']).isoformat()}
+                for entry in self.interaction_history
+            ]  # Last history_limit
         }
         
         report_file = self.output_dir / f"report_{self.session_id}.json"
-        with open(report_file, 'w') as f:
-            json.dump(report, f, indent=2)
+        report_file.write_bytes(orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        
+        self.log.info(f"\n💾 Report saved: {report_file}")
+
+
+# ═══════════════════════════════════════════════════════════════
+#  BROWSER POOL
+# ═══════════════════════════════════════════════════════════════
+
+class BrowserPool:
+    """Keep launched Chromium instances alive between exploration sessions"""
+    
+    def __init__(self, max_idle: int = 2, idle_ttl: float = 300.0):
+        self.max_idle = max_idle
+        self.idle_ttl = idle_ttl
+        self._idle: Optional[asyncio.Queue] = None
+        self._playwright = None
+        self._sweeper: Optional[asyncio.Task] = None
+    
+    async def acquire(self, headless: bool = False):
+        """Return an idle browser, launching a new one if the pool is empty"""
+        if self._idle is None:
+            self._idle = asyncio.Queue(maxsize=self.max_idle)
+        
+        while not self._idle.empty():
+            browser, _ = self._idle.get_nowait()
+            if browser.is_connected():
+                return browser
+        
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep())
         
-        print(f"\n💾 Report saved: {report_file}")
+        return await self._playwright.chromium.launch(headless=headless)
+    
+    async def release(self, browser):
+        """Close the browser's contexts and park it for the next session"""
+        for context in list(browser.contexts):
+            try:
+                await context.close()
+            except Exception:
+                pass
+        
+        if not browser.is_connected():
+            return
+        
+        try:
+            self._idle.put_nowait((browser, time.monotonic()))
+        except asyncio.QueueFull:
+            await browser.close()
+    
+    async def _sweep(self):
+        """Close browsers that have sat idle for longer than idle_ttl"""
+        while True:
+            await asyncio.sleep(min(60.0, self.idle_ttl))
+            
+            # Drain and refill without awaiting in between, so a concurrent
+            # release() can't take a freed slot and overflow the refill
+            expired = []
+            keep = []
+            now = time.monotonic()
+            while not self._idle.empty():
+                browser, released_at = self._idle.get_nowait()
+                if now - released_at > self.idle_ttl:
+                    expired.append(browser)
+                else:
+                    keep.append((browser, released_at))
+            for entry in keep:
+                self._idle.put_nowait(entry)
+            
+            for browser in expired:
+                try:
+                    await browser.close()
+                except Exception:
+                    pass
+    
+    async def close(self):
+        """Close idle browsers, stop the sweeper and the Playwright driver"""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+        
+        if self._idle is not None:
+            while not self._idle.empty():
+                browser, _ = self._idle.get_nowait()
+                try:
+                    await browser.close()
+                except Exception:
+                    pass
+            # The queue belongs to this event loop; the next acquire builds a fresh one
+            self._idle = None
+        
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+
+_BROWSER_POOL = BrowserPool(
+    max_idle=int(os.getenv('BROWSER_POOL_SIZE', '2')),
+    idle_ttl=float(os.getenv('BROWSER_POOL_IDLE_TTL', '300'))
+)
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -1080,70 +1334,87 @@ async def main():
         auth_data = json.load(f)
     
     # Start exploration
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False)
-        context = await browser.new_context(viewport={'width': 1400, 'height': 900})
-        page = await context.new_page()
+    browser = await _BROWSER_POOL.acquire(headless=False)
+    context = await browser.new_context(viewport={'width': 1400, 'height': 900})
+    page = await context.new_page()
+    
+    try:
+        # Inject authentication
+        print("\n[1/3] 🔑 Injecting authentication...")
+        parsed = urlparse(target_url)
+        homepage = f"{parsed.scheme}://{parsed.netloc}/"
+        
+        await page.goto(homepage)
+        await page.wait_for_load_state('networkidle')
+        
+        # localStorage + sessionStorage: one batched write per storage, run concurrently
+        ls_data = {
+            key: value if isinstance(value, str) else json.dumps(value)
+            for key, value in auth_data.get('local_storage', {}).items()
+        }
+        ss_data = {
+            key: value if isinstance(value, str) else json.dumps(value)
+            for key, value in auth_data.get('session_storage', {}).items()
+        }
+        ls_result, ss_result = await asyncio.gather(
+            page.evaluate(
+                "data => { for (const [k, v] of Object.entries(data)) window.localStorage.setItem(k, v); }",
+                ls_data
+            ),
+            page.evaluate(
+                "data => { for (const [k, v] of Object.entries(data)) window.sessionStorage.setItem(k, v); }",
+                ss_data
+            ),
+            return_exceptions=True
+        )
+        for storage, data, outcome in (('localStorage', ls_data, ls_result),
+                                       ('sessionStorage', ss_data, ss_result)):
+            for key in data:
+                if isinstance(outcome, Exception):
+                    print(f"  ✗ {storage}: {key} - {outcome}")
+                else:
+                    print(f"  ✓ {storage}: {key}")
+        
+        # Cookies
+        cookies = auth_data.get('cookies', [])
+        if cookies:
+            await context.add_cookies(cookies)
+            print(f"  ✓ Cookies: {len(cookies)}")
+        
+        print("\n[2/3] 🌐 Navigating to target...")
+        await page.goto(target_url, wait_until='networkidle', timeout=30000)
+        await asyncio.sleep(2)
+        
+        print(f"\n[3/3] 🚀 Starting exploration...\n")
+        
+        # Create orchestrator and explore
+        orchestrator = Orchestrator(
+            openai_api_key=openai_key,
+            goal=goal,
+            safety_mode=safety_mode,
+            max_depth=10,
+            max_elements=100
+        )
         
-        try:
-            # Inject authentication
-            print("\n[1/3] 🔑 Injecting authentication...")
-            parsed = urlparse(target_url)
-            homepage = f"{parsed.scheme}://{parsed.netloc}/"
-            
-            await page.goto(homepage)
-            await page.wait_for_load_state('networkidle')
-            
-            # localStorage
-            for key, value in auth_data.get('local_storage', {}).items():
-                try:
-                    val = value if isinstance(value, str) else json.dumps(value)
-                    await page.evaluate(f"window.localStorage.setItem('{key}', `{val}`)")
-                    print(f"  ✓ localStorage: {key}")
-                except Exception as e:
-                    print(f"  ✗ localStorage: {key} - {e}")
-            
-            # sessionStorage
-            for key, value in auth_data.get('session_storage', {}).items():
-                try:
-                    val = value if isinstance(value, str) else json.dumps(value)
-                    await page.evaluate(f"window.sessionStorage.setItem('{key}', `{val}`)")
-                    print(f"  ✓ sessionStorage: {key}")
-                except Exception as e:
-                    print(f"  ✗ sessionStorage: {key} - {e}")
-            
-            # Cookies
-            cookies = auth_data.get('cookies', [])
-            if cookies:
-                await context.add_cookies(cookies)
-                print(f"  ✓ Cookies: {len(cookies)}")
-            
-            print("\n[2/3] 🌐 Navigating to target...")
-            await page.goto(target_url, wait_until='networkidle', timeout=30000)
-            await asyncio.sleep(2)
-            
-            print(f"\n[3/3] 🚀 Starting exploration...\n")
-            
-            # Create orchestrator and explore
-            orchestrator = Orchestrator(
-                openai_api_key=openai_key,
-                goal=goal,
-                safety_mode=safety_mode,
-                max_depth=10,
-                max_elements=100
-            )
-            
-            await orchestrator.explore(page)
-            
-        except Exception as e:
-            print(f"\n❌ Fatal error: {e}")
-            import traceback
-            traceback.print_exc()
+        await orchestrator.explore(page)
         
-        finally:
-            input("\n👁️  Browser open. Press Enter to close...")
-            await browser.close()
+    except Exception as e:
+        print(f"\n❌ Fatal error: {e}")
+        import traceback
+        traceback.print_exc()
+    
+    finally:
+        input("\n👁️  Browser open. Press Enter to close...")
+        await _BROWSER_POOL.release(browser)
+
+
+async def _run_cli():
+    """Run one session, then shut the pool down with the process"""
+    try:
+        await main()
+    finally:
+        await _BROWSER_POOL.close()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(_run_cli())
\ No newline at end of file
@@ -1,4 +1,5 @@
 import asyncio
+import weakref
 from typing import Dict, Optional
 from playwright.async_api import Page
 from rich.console import Console
@@ -6,10 +7,77 @@ from .knowledge_graph import KnowledgeGraph
 from .logger import CrawlerLogger
 
 console = Console()
+
+_ANCESTRY_JS = """
+    ({parentText, childText}) => {
+        const allElements = Array.from(document.querySelectorAll('*'));
+        
+        const parentEl = allElements.find(el => {
+            const directText = Array.from(el.childNodes)
+                .filter(n => n.nodeType === Node.TEXT_NODE)
+                .map(n => n.textContent.trim())
+                .join('');
+            return directText.includes(parentText) || 
+                el.textContent.trim().startsWith(parentText);
+        });
+        
+        if (!parentEl) return false;
+        
+        const containerEl = parentEl.closest('li, [class*="menu-item"], [class*="nav-item"]') 
+                        || parentEl.parentElement;
+        
+        if (!containerEl) return false;
+        
+        const childEl = Array.from(containerEl.querySelectorAll('*'))
+            .find(el => {
+                const text = el.textContent?.trim() || '';
+                return text.includes(childText) || text.startsWith(childText);
+            });
+        
+        if (!childEl) return false;
+        
+        const childLocation = childEl.closest('[class*="sidebar"]') ? 'sidebar' :
+                            childEl.closest('[class*="header"]') ? 'header' :
+                            childEl.closest('main, [class*="content"]') ? 'main' : 'unknown';
+        
+        const parentLocation = containerEl.closest('[class*="sidebar"]') ? 'sidebar' :
+                            containerEl.closest('[class*="header"]') ? 'header' : 'unknown';
+        
+        if (childLocation === 'main' && parentLocation === 'sidebar') {
+            return false;
+        }
+        
+        const isExpanded = parentEl.getAttribute('aria-expanded') === 'true';
+        const hasVisibleChildren = containerEl.querySelector('ul, [class*="submenu"], [class*="dropdown"]');
+        
+        if (hasVisibleChildren) {
+            const collapsibleSection = childEl.closest('ul, [class*="submenu"], [class*="dropdown"]');
+            if (!collapsibleSection) return false;
+            
+            if (!containerEl.contains(collapsibleSection)) return false;
+        }
+        
+        return true;
+    }
+"""
+
+# Registered once per browser context so each call only ships the arguments
+_ANCESTRY_INIT_JS = f"window.__checkAncestry = {_ANCESTRY_JS.strip()};"
+_CALL_ANCESTRY_JS = (
+    "args => typeof window.__checkAncestry === 'function' "
+    "? window.__checkAncestry(args) : null"
+)
+_INSTALL_ANCESTRY_JS = (
+    f"args => {{ window.__checkAncestry = {_ANCESTRY_JS.strip()}; "
+    "return window.__checkAncestry(args); }"
+)
+
+
 class GraphBuilder:
     def __init__(self, knowledge_graph: KnowledgeGraph, logger: CrawlerLogger):
         self.kg = knowledge_graph
         self.logger = logger
+        self._ancestry_contexts = weakref.WeakSet()
 
     async def register_container(
         self,
@@ -70,7 +138,9 @@ class GraphBuilder:
         is_dom_child = await self._check_dom_ancestry(
             page,
             parent_text=parent_container['text'],
-            child_text=feature['text']
+            child_text=feature['text'],
+            parent_location=parent_container.get('location', 'unknown'),
+            child_location=feature.get('location', 'unknown')
         )
 
         confidence = 'dom_confirmed' if is_dom_child else 'vision_only'
@@ -127,65 +197,32 @@ class GraphBuilder:
             parent_container_id=None
         )
 
+    async def _register_ancestry_script(self, page: Page):
+        context = page.context
+        if context in self._ancestry_contexts:
+            return
+        await context.add_init_script(_ANCESTRY_INIT_JS)
+        self._ancestry_contexts.add(context)
+
     async def _check_dom_ancestry(
         self,
         page: Page,
         parent_text: str,
-        child_text: str
+        child_text: str,
+        parent_location: str = 'unknown',
+        child_location: str = 'unknown'
     ) -> bool:
+        # Same rule the JS enforces: a sidebar container never owns main-content items
+        if parent_location == 'sidebar' and child_location == 'main':
+            return False
+
         try:
-            result = await page.evaluate("""
-                ({parentText, childText}) => {
-                    const allElements = Array.from(document.querySelectorAll('*'));
-                    
-                    const parentEl = allElements.find(el => {
-                        const directText = Array.from(el.childNodes)
-                            .filter(n => n.nodeType === Node.TEXT_NODE)
-                            .map(n => n.textContent.trim())
-                            .join('');
-                        return directText.includes(parentText) || 
-                            el.textContent.trim().startsWith(parentText);
-                    });
-                    
-                    if (!parentEl) return false;
-                    
-                    const containerEl = parentEl.closest('li, [class*="menu-item"], [class*="nav-item"]') 
-                                    || parentEl.parentElement;
-                    
-                    if (!containerEl) return false;
-                    
-                    const childEl = Array.from(containerEl.querySelectorAll('*'))
-                        .find(el => {
-                            const text = el.textContent?.trim() || '';
-                            return text.includes(childText) || text.startsWith(childText);
-                        });
-                    
-                    if (!childEl) return false;
-                    
-                    const childLocation = childEl.closest('[class*="sidebar"]') ? 'sidebar' :
-                                        childEl.closest('[class*="header"]') ? 'header' :
-                                        childEl.closest('main, [class*="content"]') ? 'main' : 'unknown';
-                    
-                    const parentLocation = containerEl.closest('[class*="sidebar"]') ? 'sidebar' :
-                                        containerEl.closest('[class*="header"]') ? 'header' : 'unknown';
-                    
-                    if (childLocation === 'main' && parentLocation === 'sidebar') {
-                        return false;
-                    }
-                    
-                    const isExpanded = parentEl.getAttribute('aria-expanded') === 'true';
-                    const hasVisibleChildren = containerEl.querySelector('ul, [class*="submenu"], [class*="dropdown"]');
-                    
-                    if (hasVisibleChildren) {
-                        const collapsibleSection = childEl.closest('ul, [class*="submenu"], [class*="dropdown"]');
-                        if (!collapsibleSection) return false;
-                        
-                        if (!containerEl.contains(collapsibleSection)) return false;
-                    }
-                    
-                    return true;
-                }
-            """, {'parentText': parent_text, 'childText': child_text})
+            await self._register_ancestry_script(page)
+            args = {'parentText': parent_text, 'childText': child_text}
+            result = await page.evaluate(_CALL_ANCESTRY_JS, args)
+            if result is None:
+                # Document predates the init script (or it was never registered)
+                result = await page.evaluate(_INSTALL_ANCESTRY_JS, args)
 
             return bool(result)
 
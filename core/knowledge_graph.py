@@ -1,17 +1,47 @@
-import json
+import logging
+import sys
+import time
+from dataclasses import dataclass, asdict, fields
 from pathlib import Path
 from typing import Dict, List, Optional
 from datetime import datetime
+import orjson
 from rich.console import Console
 from .logger import CrawlerLogger
 
 console = Console()
+_log = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class KGNode:
+    semantic_id: str
+    # Defaults let graph files from older versions load with fields missing
+    text: str = ''
+    node_type: str = ''
+    location: str = ''
+    anchor_url: str = ''
+    element_type: str = ''
+    confidence: str = 'vision_only'
+    target_url: Optional[str] = None
+    discovered_at: float = 0.0  # Epoch seconds; rendered as ISO only when serialized
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data['discovered_at'] = datetime.fromtimestamp(self.discovered_at).isoformat()
+        return data
+
+
+# Keys load() accepts from a saved node; anything else in the file is ignored
+_KGNODE_FIELDS = frozenset(f.name for f in fields(KGNode))
+
 
 class KnowledgeGraph:
     def __init__(self, logger: CrawlerLogger):
-        self.nodes: Dict[str, Dict] = {}
+        self.nodes: Dict[str, KGNode] = {}
         self.edges: List[Dict] = []
         self.paths: Dict[str, List[Dict]] = {}
+        self._deep_link_count = 0
         self.graph_file = Path('semantic_test_output') / 'knowledge_graph.json'
         self.logger = logger
 
@@ -27,24 +57,26 @@ class KnowledgeGraph:
         target_url: Optional[str] = None  # NEW: Optional deep link URL
     ):
         if semantic_id not in self.nodes:
-            self.nodes[semantic_id] = {
-                'semantic_id': semantic_id,
-                'text': text,
-                'node_type': node_type,
-                'location': location,
-                'anchor_url': anchor_url,
-                'element_type': element_type,
-                'confidence': confidence,
-                'target_url': target_url,  # NEW: Store the deep link
-                'discovered_at': datetime.now().isoformat()
-            }
-            
-            # Enhanced logging
-            log_msg = f"📍 KG Node added: {semantic_id} ({confidence})"
+            # Low-cardinality fields share one string object across all nodes
+            self.nodes[semantic_id] = KGNode(
+                semantic_id=semantic_id,
+                text=text,
+                node_type=sys.intern(node_type),
+                location=sys.intern(location),
+                anchor_url=anchor_url,
+                element_type=sys.intern(element_type),
+                confidence=sys.intern(confidence),
+                target_url=target_url,  # NEW: Store the deep link
+                discovered_at=time.time()
+            )
             if target_url:
-                log_msg += f" → {target_url}"
-                console.print(f"[dim]   {log_msg}[/dim]")
-            else:
+                self._deep_link_count += 1
+            
+            # Enhanced logging (per-node console output is debug-only)
+            if _log.isEnabledFor(logging.DEBUG):
+                log_msg = f"📍 KG Node added: {semantic_id} ({confidence})"
+                if target_url:
+                    log_msg += f" → {target_url}"
                 console.print(f"[dim]   {log_msg}[/dim]")
             
             self.logger.log_action("kg_node_added", {
@@ -58,7 +90,7 @@ class KnowledgeGraph:
 
     def upgrade_confidence(self, semantic_id: str):
         if semantic_id in self.nodes:
-            self.nodes[semantic_id]['confidence'] = 'dom_confirmed'
+            self.nodes[semantic_id].confidence = 'dom_confirmed'
             self.logger.log_action("kg_confidence_upgraded", {
                 "semantic_id": semantic_id,
                 "new_confidence": "dom_confirmed"
@@ -87,10 +119,11 @@ class KnowledgeGraph:
         }
         self.edges.append(edge)
         
-        edge_display = f"{from_id} --[{edge_type}]--> {to_id}"
-        if target_url:
-            edge_display += f" → {target_url}"
-        console.print(f"[dim]   🔗 KG Edge: {edge_display}[/dim]")
+        if _log.isEnabledFor(logging.DEBUG):
+            edge_display = f"{from_id} --[{edge_type}]--> {to_id}"
+            if target_url:
+                edge_display += f" → {target_url}"
+            console.print(f"[dim]   🔗 KG Edge: {edge_display}[/dim]")
         
         self.logger.log_action("kg_edge_added", {
             "from_id": from_id,
@@ -106,7 +139,8 @@ class KnowledgeGraph:
         parent_container_id: Optional[str],
     ):
         if feature_id in self.paths:
-            console.print(f"[dim]   ⏭️  Path already exists for {feature_id}[/dim]")
+            if _log.isEnabledFor(logging.DEBUG):
+                console.print(f"[dim]   ⏭️  Path already exists for {feature_id}[/dim]")
             return
         
         node = self.nodes.get(feature_id)
@@ -115,7 +149,7 @@ class KnowledgeGraph:
             self.logger.log_error("path_build_failed", f"Node {feature_id} not found", {"feature_id": feature_id})
             return
         
-        anchor_url = node.get('anchor_url')
+        anchor_url = node.anchor_url
         if not anchor_url:
             console.print(f"[red]   ❌ Node {feature_id} missing anchor_url[/red]")
             self.logger.log_error("path_build_failed", f"Node {feature_id} missing anchor_url", {"feature_id": feature_id})
@@ -137,29 +171,31 @@ class KnowledgeGraph:
                 if step['step_type'] != 'ensure_url':
                     steps.append(step)
 
-            parent_node = self.nodes.get(parent_container_id, {})
+            parent_node = self.nodes.get(parent_container_id)
+            parent_text = parent_node.text if parent_node else ''
             steps.append({
                 'step_type': 'expand_container',
                 'container_id': parent_container_id,
-                'container_text': parent_node.get('text', ''),
-                'container_location': parent_node.get('location', ''),
+                'container_text': parent_text,
+                'container_location': parent_node.location if parent_node else '',
                 'anchor_url': anchor_url,
-                'description': f"Expand '{parent_node.get('text', '')}'"
+                'description': f"Expand '{parent_text}'"
             })
 
         self.paths[feature_id] = steps
         
         # Enhanced logging
-        path_info = f"🗺️  Path created for {feature_id}: {len(steps)} steps"
-        if node.get('target_url'):
-            path_info += f" (⚡ DEEP LINK AVAILABLE: {node['target_url']})"
-        console.print(f"[dim]   {path_info}[/dim]")
+        if _log.isEnabledFor(logging.DEBUG):
+            path_info = f"🗺️  Path created for {feature_id}: {len(steps)} steps"
+            if node.target_url:
+                path_info += f" (⚡ DEEP LINK AVAILABLE: {node.target_url})"
+            console.print(f"[dim]   {path_info}[/dim]")
         
         self.logger.log_action("kg_path_created", {
             "feature_id": feature_id,
             "path_length": len(steps),
             "has_parent": parent_container_id is not None,
-            "has_deep_link": bool(node.get('target_url'))
+            "has_deep_link": bool(node.target_url)
         })
 
     def get_path(self, feature_id: str) -> List[Dict]:
@@ -179,26 +215,50 @@ class KnowledgeGraph:
         node = self.nodes.get(feature_id)
         if not node:
             return None
-        return node.get('target_url')
+        return node.target_url
+
+    def nodes_as_dicts(self) -> Dict[str, Dict]:
+        return {node_id: node.to_dict() for node_id, node in self.nodes.items()}
 
     def save(self):
         self.graph_file.parent.mkdir(exist_ok=True)
-        data = {
-            'nodes': self.nodes,
-            'edges': self.edges,
-            'paths': self.paths,
-            'saved_at': datetime.now().isoformat(),
-            'stats': {
-                'total_nodes': len(self.nodes),
-                'nodes_with_deep_links': sum(1 for n in self.nodes.values() if n.get('target_url')),
-                'total_edges': len(self.edges),
-                'total_paths': len(self.paths)
-            }
+        stats = {
+            'total_nodes': len(self.nodes),
+            'nodes_with_deep_links': self._deep_link_count,
+            'total_edges': len(self.edges),
+            'total_paths': len(self.paths)
         }
-        with open(self.graph_file, 'w') as f:
-            json.dump(data, f, indent=2)
+
+        # Stream each node/edge/path straight to disk instead of building
+        # (and encoding) one big document in memory
+        dumps = orjson.dumps
+        with open(self.graph_file, 'wb') as f:
+            f.write(b'{"nodes":{')
+            for i, (node_id, node) in enumerate(self.nodes.items()):
+                if i:
+                    f.write(b',')
+                f.write(dumps(node_id))
+                f.write(b':')
+                f.write(dumps(node.to_dict()))
+            f.write(b'},"edges":[')
+            for i, edge in enumerate(self.edges):
+                if i:
+                    f.write(b',')
+                f.write(dumps(edge))
+            f.write(b'],"paths":{')
+            for i, (feature_id, steps) in enumerate(self.paths.items()):
+                if i:
+                    f.write(b',')
+                f.write(dumps(feature_id))
+                f.write(b':')
+                f.write(dumps(steps))
+            f.write(b'},"saved_at":')
+            f.write(dumps(datetime.now().isoformat()))
+            f.write(b',"stats":')
+            f.write(dumps(stats))
+            f.write(b'}')
         
-        deep_link_count = data['stats']['nodes_with_deep_links']
+        deep_link_count = stats['nodes_with_deep_links']
         self.logger.log_info(
             f"Knowledge graph saved: {len(self.nodes)} nodes "
             f"({deep_link_count} with deep links), {len(self.edges)} edges"
@@ -206,13 +266,23 @@ class KnowledgeGraph:
 
     def load(self):
         if self.graph_file.exists():
-            with open(self.graph_file, 'r') as f:
-                data = json.load(f)
-            self.nodes = data.get('nodes', {})
+            data = orjson.loads(self.graph_file.read_bytes())
+            self.nodes = {}
+            for node_id, node in data.get('nodes', {}).items():
+                node = {k: v for k, v in node.items() if k in _KGNODE_FIELDS}
+                node.setdefault('semantic_id', node_id)
+                for field in ('node_type', 'location', 'element_type', 'confidence'):
+                    if isinstance(node.get(field), str):
+                        node[field] = sys.intern(node[field])
+                if isinstance(node.get('discovered_at'), str):
+                    node['discovered_at'] = datetime.fromisoformat(node['discovered_at']).timestamp()
+                self.nodes[node_id] = KGNode(**node)
             self.edges = data.get('edges', [])
             self.paths = data.get('paths', {})
             
-            deep_link_count = sum(1 for n in self.nodes.values() if n.get('target_url'))
+            # One pass on load; add_node keeps the count current afterwards
+            self._deep_link_count = sum(1 for n in self.nodes.values() if n.target_url)
+            deep_link_count = self._deep_link_count
             console.print(
                 f"[green]   ✅ Knowledge graph loaded: {len(self.nodes)} nodes "
                 f"({deep_link_count} with deep links), {len(self.edges)} edges[/green]"
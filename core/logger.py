@@ -1,6 +1,8 @@
 
-import json
+import atexit
 import logging
+import time
+import orjson
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict
@@ -13,7 +15,10 @@ class CrawlerLogger:
     - Statistics tracking
     """
     
-    def __init__(self, output_dir: Path):
+    # Buffered log files are flushed after this many writes
+    FLUSH_EVERY = 32
+    
+    def __init__(self, output_dir: Path, verbose_main_log: bool = False):
         self.output_dir = output_dir
         self.output_dir.mkdir(exist_ok=True)
         
@@ -36,59 +41,138 @@ class CrawlerLogger:
         # Initialize action counter
         self.action_counter = 0
         
+        # actions_log.jsonl is the canonical action record (read it with jq);
+        # only mirror actions into the text log when explicitly requested
+        self._verbose_main_log = verbose_main_log
+        
+        # Cached "YYYY-mm-dd HH:MM:SS" for the current second (see _ts)
+        self._ts_sec = -1
+        self._ts_str = ""
+        
+        # Long-lived buffered handles instead of open/append/close per entry
+        self._main_fh = None
+        self._action_fh = None
+        self._error_fh = None
+        self._history_fh = None
+        self._open_log_files()
+        
         # Set up Python logging
-        self._setup_python_logging()
+        self._setup_python_logging(timestamp)
         
         self.log_info("=" * 80)
         self.log_info(f"CRAWLER SESSION STARTED: {timestamp}")
         self.log_info("=" * 80)
     
-    def _setup_python_logging(self):
-        """Configure Python's logging module for error tracking"""
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(self.error_log_file),
-                logging.StreamHandler()
-            ]
-        )
-        self.logger = logging.getLogger(__name__)
+    def _setup_python_logging(self, timestamp: str):
+        """Per-session Python logger for error tracking (root logger is left alone)"""
+        # id(self) keeps sessions started within the same second on separate loggers
+        self.logger = logging.getLogger(f"{__name__}.{timestamp}.{id(self):x}")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+        self._py_handlers = [
+            logging.FileHandler(self.error_log_file, delay=True),
+            logging.StreamHandler()
+        ]
+        for handler in self._py_handlers:
+            handler.setFormatter(formatter)
+            self.logger.addHandler(handler)
+    
+    def _open_log_files(self):
+        """Open (or reopen after close()) the buffered log file handles"""
+        # Binary mode: entries are UTF-8 encoded once, orjson output is written as-is
+        self._main_fh = self.main_log_file.open('ab', buffering=65536)
+        self._action_fh = self.action_log_file.open('ab', buffering=65536)
+        self._error_fh = self.error_log_file.open('ab', buffering=65536)
+        self._history_fh = (self.plans_dir / "plan_version_history.jsonl").open('ab', buffering=32768)
+        self._pending_writes = 0
+        # A crash or Ctrl-C skips save_final_summary; still get the buffered tail to disk
+        atexit.register(self.close)
+    
+    def _count_write(self):
+        self._pending_writes += 1
+        if self._pending_writes >= self.FLUSH_EVERY:
+            self.flush()
+    
+    def flush(self):
+        """Push buffered log entries to disk"""
+        for fh in (self._main_fh, self._action_fh, self._error_fh, self._history_fh):
+            if fh is not None:
+                fh.flush()
+        self._pending_writes = 0
+    
+    def close(self):
+        """Flush and close the log files; later log calls reopen them"""
+        atexit.unregister(self.close)
+        self.flush()
+        for fh in (self._main_fh, self._action_fh, self._error_fh, self._history_fh):
+            if fh is not None:
+                fh.close()
+        self._main_fh = self._action_fh = self._error_fh = self._history_fh = None
+        # Detach the session handlers so their file descriptors don't outlive the session
+        for handler in self._py_handlers:
+            self.logger.removeHandler(handler)
+            handler.close()
+        self._py_handlers = []
+    
+    def _ts(self, now: float = None) -> str:
+        """Millisecond log timestamp; the seconds part is formatted once per second"""
+        if now is None:
+            now = time.time()
+        sec = int(now)
+        if sec != self._ts_sec:
+            self._ts_sec = sec
+            self._ts_str = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(sec))
+        return f"{self._ts_str}.{int((now - sec) * 1000):03d}"
+    
+    def _write_main(self, entry: bytes):
+        if self._main_fh is None:
+            self._open_log_files()
+        self._main_fh.write(entry)
+        self._count_write()
     
     def log_info(self, message: str):
         """Log informational message to main log file"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-        log_entry = f"[{timestamp}] {message}\n"
-        with open(self.main_log_file, 'a', encoding='utf-8') as f:
-            f.write(log_entry)
+        self._write_main(f"[{self._ts()}] {message}\n".encode('utf-8'))
     
     def log_action(self, action_type: str, details: Dict):
         """Log structured action data in JSON Lines format"""
         self.action_counter += 1
-        action_entry = {
+        now = time.time()
+        
+        # Serialize details once and reuse the bytes for both sinks
+        details_json = orjson.dumps(details, option=orjson.OPT_NON_STR_KEYS)
+        header = orjson.dumps({
             "action_id": self.action_counter,
-            "timestamp": datetime.now().isoformat(),
-            "action_type": action_type,
-            "details": details
-        }
+            "timestamp": datetime.fromtimestamp(now).isoformat(),
+            "action_type": action_type
+        })
         
-        with open(self.action_log_file, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(action_entry, ensure_ascii=False) + '\n')
+        if self._action_fh is None:
+            self._open_log_files()
+        self._action_fh.write(header[:-1] + b',"details":' + details_json + b'}\n')
+        self._count_write()
         
-        # Also log to main log for easy reading
-        self.log_info(f"ACTION #{self.action_counter}: {action_type} - {json.dumps(details, ensure_ascii=False)}")
+        # One-line summary in the main log; full details live in the JSONL
+        if self._verbose_main_log:
+            self._write_main(
+                f"[{self._ts(now)}] ACTION #{self.action_counter}: {action_type} "
+                f"keys={list(details)[:6]} ({len(details_json)} bytes)\n".encode('utf-8')
+            )
     
     def log_error(self, error_type: str, error_message: str, context: Dict = None):
         """Log error with context"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-        error_entry = f"\n[{timestamp}] ERROR: {error_type}\n"
+        error_entry = f"\n[{self._ts()}] ERROR: {error_type}\n"
         error_entry += f"Message: {error_message}\n"
         if context:
-            error_entry += f"Context: {json.dumps(context, indent=2, ensure_ascii=False)}\n"
+            context_json = orjson.dumps(context, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            error_entry += f"Context: {context_json.decode('utf-8')}\n"
         error_entry += "-" * 80 + "\n"
         
-        with open(self.error_log_file, 'a', encoding='utf-8') as f:
-            f.write(error_entry)
+        if self._error_fh is None:
+            self._open_log_files()
+        self._error_fh.write(error_entry.encode('utf-8'))
+        self._error_fh.flush()  # Errors go to disk immediately
         
         self.logger.error(f"{error_type}: {error_message}")
     
@@ -96,13 +180,13 @@ class CrawlerLogger:
         """Save assumption plan (only once)"""
         if not self.assumption_plan_saved:
             plan_file = self.plans_dir / "assumption_plan.json"
-            with open(plan_file, 'w', encoding='utf-8') as f:
-                json.dump({
+            with open(plan_file, 'wb') as f:
+                f.write(orjson.dumps({
                     "plan_type": "assumption_discovery",
                     "created_at": datetime.now().isoformat(),
                     "total_steps": len(plan),
                     "steps": plan
-                }, f, indent=2, ensure_ascii=False)
+                }, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
             
             self.log_info(f"Saved assumption plan: {len(plan)} steps")
             self.assumption_plan_saved = True
@@ -119,24 +203,23 @@ class CrawlerLogger:
         
         # Save this version
         version_file = self.plans_dir / f"main_action_plan_v{version_num}.json"
-        with open(version_file, 'w', encoding='utf-8') as f:
-            json.dump({
+        with open(version_file, 'wb') as f:
+            f.write(orjson.dumps({
                 "version": version_num,
                 "reason": reason,
                 "created_at": datetime.now().isoformat(),
                 "total_steps": len(plan),
                 "steps": plan
-            }, f, indent=2, ensure_ascii=False)
+            }, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
         
         self.log_info(f"Saved main action plan version {version_num}: {reason} ({len(plan)} steps)")
         
-        # Also save version history
-        history_file = self.plans_dir / "plan_version_history.json"
-        with open(history_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                "total_versions": len(self.main_action_plan_versions),
-                "versions": self.main_action_plan_versions
-            }, f, indent=2, ensure_ascii=False)
+        # Append to the version history sidecar; the consolidated
+        # plan_version_history.json is written once by save_final_summary
+        if self._history_fh is None:
+            self._open_log_files()
+        self._history_fh.write(orjson.dumps(self.main_action_plan_versions[-1]) + b'\n')
+        self._count_write()
     
     def log_vision_analysis(self, url: str, analysis: Dict):
         """Log GPT-4 Vision analysis results"""
@@ -191,17 +274,25 @@ class CrawlerLogger:
     def save_final_summary(self, stats: Dict, kg_summary: Dict):
         """Save final exploration summary"""
         summary_file = self.session_dir / "exploration_summary.json"
-        with open(summary_file, 'w', encoding='utf-8') as f:
-            json.dump({
+        with open(summary_file, 'wb') as f:
+            f.write(orjson.dumps({
                 "session_ended": datetime.now().isoformat(),
                 "statistics": stats,
                 "knowledge_graph_summary": kg_summary,
                 "total_actions": self.action_counter,
                 "plan_versions": len(self.main_action_plan_versions)
-            }, f, indent=2, ensure_ascii=False)
+            }, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        
+        history_file = self.plans_dir / "plan_version_history.json"
+        with open(history_file, 'wb') as f:
+            f.write(orjson.dumps({
+                "total_versions": len(self.main_action_plan_versions),
+                "versions": self.main_action_plan_versions
+            }, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
         
         self.log_info("=" * 80)
         self.log_info("SESSION COMPLETED")
         self.log_info(f"Total actions logged: {self.action_counter}")
         self.log_info(f"Plan versions saved: {len(self.main_action_plan_versions)}")
         self.log_info("=" * 80)
+        self.close()
@@ -1,6 +1,8 @@
 
 import hashlib
-from typing import Dict
+import time
+from array import array
+from typing import Dict, List
 from datetime import datetime
 from playwright.async_api import Page
 from .logger import CrawlerLogger
@@ -8,43 +10,64 @@ from .logger import CrawlerLogger
 
 class StateManager:
     def __init__(self, logger: CrawlerLogger):
-        self.states = {}
+        # Visited states stored column-wise (one entry per state at the same index);
+        # keys are the raw 6-byte digests, not their hex form
+        self.hash_to_idx: Dict[bytes, int] = {}
+        self.hashes: List[bytes] = []
+        self.urls: List[str] = []
+        self.breadcrumbs: List[str] = []
+        self.container_counts = array('i')
+        self.feature_counts = array('i')
+        self.visited_at = array('d')
         self.current_state_hash = None
         self._navigation_occurred = False
         self.logger = logger
 
     async def calculate_state_hash(self, page: Page) -> str:
-        state_data = await page.evaluate("""
-            () => ({
-                url: window.location.pathname,
-                title: document.title,
-                main_headings: Array.from(document.querySelectorAll('h1, h2, h3'))
-                    .map(h => h.textContent?.trim()).filter(t => t).join('|'),
-                interactive_count: document.querySelectorAll('a, button').length
-            })
+        # JS builds the hash input directly; Python only encodes and hashes it
+        hash_input = await page.evaluate("""
+            () => `${window.location.pathname}::${
+                Array.from(document.querySelectorAll('h1, h2, h3'))
+                    .map(h => h.textContent?.trim()).filter(t => t).join('|')
+            }::${document.querySelectorAll('a, button').length}`
         """)
-        hash_string = f"{state_data['url']}::{state_data['main_headings']}::{state_data['interactive_count']}"
-        return hashlib.sha256(hash_string.encode()).hexdigest()[:12]
+        # Non-cryptographic use: 6-byte blake2b gives the same 12 hex chars as before
+        return hashlib.blake2b(hash_input.encode(), digest_size=6).hexdigest()
 
     def is_state_visited(self, state_hash: str) -> bool:
-        return state_hash in self.states
+        return bytes.fromhex(state_hash) in self.hash_to_idx
 
     def record_state(self, state_hash, url, breadcrumb, containers, features):
-        if state_hash not in self.states:
-            self.states[state_hash] = {
-                'hash': state_hash,
-                'url': url,
-                'breadcrumb': breadcrumb,
-                'container_count': len(containers),
-                'feature_count': len(features),
-                'visited_at': datetime.now().isoformat()
-            }
+        h_bytes = bytes.fromhex(state_hash)
+        if h_bytes not in self.hash_to_idx:
+            self.hash_to_idx[h_bytes] = len(self.hashes)
+            self.hashes.append(h_bytes)
+            self.urls.append(url)
+            self.breadcrumbs.append(breadcrumb)
+            self.container_counts.append(len(containers))
+            self.feature_counts.append(len(features))
+            self.visited_at.append(time.time())
             self.logger.log_action("state_recorded", {
                 "state_hash": state_hash,
                 "url": url,
                 "breadcrumb": breadcrumb
             })
 
+    def states_as_dicts(self) -> Dict[str, Dict]:
+        """Rebuild the per-state records (keyed by hex hash) for JSON export"""
+        states = {}
+        for i, h_bytes in enumerate(self.hashes):
+            state_hash = h_bytes.hex()
+            states[state_hash] = {
+                'hash': state_hash,
+                'url': self.urls[i],
+                'breadcrumb': self.breadcrumbs[i],
+                'container_count': self.container_counts[i],
+                'feature_count': self.feature_counts[i],
+                'visited_at': datetime.fromtimestamp(self.visited_at[i]).isoformat()
+            }
+        return states
+
     def signal_navigation(self):
         self._navigation_occurred = True
         self.logger.log_action("navigation_signal", {"status": "navigation_occurred"})
@@ -1,16 +1,17 @@
 
 import asyncio
-import json
+import io
+import re
 import hashlib
 import base64
-from typing import Dict, List
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import orjson
+from PIL import Image
 from playwright.async_api import Page
 from rich.console import Console
 from openai import OpenAI
 from .logger import CrawlerLogger
-import anthropic
-from openai import OpenAI
-import base64
 from dotenv import load_dotenv
 import os
 
@@ -18,179 +19,35 @@ load_dotenv()
 
 console = Console()
 
-class GPTVisionAnalyzer:
-    def __init__(self, openai_client: OpenAI, logger: CrawlerLogger):
-        self.client = openai_client
-        self.analysis_cache = {}
-        self.logger = logger
-    
-    async def analyze_expanded_container(self, page: Page, url: str, container_text: str) -> Dict:
-        """
-        Analyze an expanded container with scrolling to capture ALL children.
-        Takes multiple screenshots at different scroll positions.
-        """
-        console.print(f"[cyan]📸 VISION: Analyzing expanded container '{container_text}' with scroll...[/cyan]")
-        self.logger.log_info(f"Starting expanded container analysis for: {container_text}")
-
-        screenshots = []
-        
-        try:
-            # Find the expanded menu container - ADJUST THIS SELECTOR FOR YOUR APP!
-            menu_selector = '.fuse-vertical-navigation-item-children'
-            
-            # Check if element exists and is scrollable
-            is_scrollable = await page.evaluate(f'''
-                (() => {{
-                    const el = document.querySelector('{menu_selector}');
-                    if (!el) return false;
-                    return el.scrollHeight > el.clientHeight;
-                }})()
-            ''')
-            
-            if is_scrollable:
-                console.print("[yellow]   📜 Menu is scrollable - taking multiple screenshots[/yellow]")
-                
-                # Scroll to BOTTOM and capture
-                await page.evaluate(f'''
-                    document.querySelector('{menu_selector}').scrollTop = 
-                    document.querySelector('{menu_selector}').scrollHeight
-                ''')
-                await page.wait_for_timeout(500)
-                screenshot_bottom = await page.screenshot(full_page=False, type='png')
-                screenshots.append(screenshot_bottom)
-                
-                # Scroll to TOP and capture
-                await page.evaluate(f'''
-                    document.querySelector('{menu_selector}').scrollTop = 0
-                ''')
-                await page.wait_for_timeout(500)
-                screenshot_top = await page.screenshot(full_page=False, type='png')
-                screenshots.append(screenshot_top)
-                
-            else:
-                console.print("[yellow]   📄 Menu not scrollable - taking single screenshot[/yellow]")
-                screenshot = await page.screenshot(full_page=False, type='png')
-                screenshots.append(screenshot)
-                
-        except Exception as e:
-            console.print(f"[red]   ⚠️ Scroll failed, using single screenshot: {e}[/red]")
-            screenshot = await page.screenshot(full_page=False, type='png')
-            screenshots = [screenshot]
-
-        # Now send ALL screenshots to vision model
-        # Convert screenshots to base64
-        image_urls = []
-        for screenshot_bytes in screenshots:
-            screenshot_b64 = base64.standard_b64encode(screenshot_bytes).decode('utf-8')
-            image_urls.append(f"data:image/png;base64,{screenshot_b64}")
-
-        prompt = f"""You are analyzing an EXPANDED menu container titled "{container_text}".
-
-    **IMPORTANT:** You are receiving MULTIPLE screenshots of the same menu at different scroll positions.
-    Your job is to identify ALL unique child items across ALL screenshots.
-
-    Look for:
-    - Menu items (links)
-    - Sub-sections
-    - Buttons
-
-    Return ONLY the child items you see, in this format:
-
-    {{
-    "page_type": "expanded_menu",
-    "containers": [],
-    "features": [
-        {{
-        "text": "EXACT text from screen",
-        "type": "link|button",
-        "location": "sidebar_child",
-        "test_priority": 8,
-        "expected_behavior": "Navigate to sub-page"
-        }}
-    ],
-    "discovery_strategy": {{
-        "recommended_order": [],
-        "reasoning": "All items discovered from expanded menu"
-    }}
-    }}
-
-    **CRITICAL:** Copy text EXACTLY character-by-character. Do NOT translate or paraphrase."""
-
-        try:
-            # Build message content with all screenshots
-            message_content = [{"type": "text", "text": prompt}]
-            for img_url in image_urls:
-                message_content.append({
-                    "type": "image_url",
-                    "image_url": {"url": img_url}
-                })
-
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{
-                    "role": "user",
-                    "content": message_content
-                }],
-                max_tokens=4000
-            )
-#             response = self.client.messages.create(
-#     model="claude-sonnet-4-20250514",
-#     max_tokens=1500,
-#     messages=[{
-#         "role": "user",
-#         "content": [
-#             {"type": "image", "source": {
-#                 "type": "base64",
-#                 "media_type": "image/png",
-#                 "data": screenshot_b64
-#             }},
-#             {"type": "text", "text": prompt}
-#         ]
-#     }]
-# )
-            vision_text = response.choices[0].message.content
-
-            # vision_text = response.content[0].text
-            
-            console.print("\n" + "="*80)
-            console.print(f"EXPANDED CONTAINER VISION RESPONSE ({container_text}):")
-            console.print(vision_text)
-            console.print("="*80 + "\n")
-
-            if vision_text.startswith('```'):
-                vision_text = vision_text.split('\n', 1)[1].rsplit('\n', 1)[0]
-                if vision_text.startswith('json'):
-                    vision_text = vision_text[4:].strip()
-
-            analysis = json.loads(vision_text)
-            
-            console.print(f"[green]   ✅ Found {len(analysis.get('features', []))} children in '{container_text}'[/green]")
-            
-            return analysis
-
-        except Exception as e:
-            console.print(f"[red]   ❌ Expanded container analysis failed: {e}[/red]")
-            self.logger.log_error("expanded_container_analysis_failed", str(e))
-            return {
-                "page_type": "expanded_menu",
-                "containers": [],
-                "features": [],
-                "discovery_strategy": {"recommended_order": [], "reasoning": "Analysis failed"}
-            }
-    async def analyze_page(self, page: Page, url: str) -> Dict:
-        console.print("[cyan]📸 VISION: Taking screenshot and analyzing with GPT-4...[/cyan]")
-        self.logger.log_info(f"Starting vision analysis for: {url}")
-
-        screenshot_bytes = await page.screenshot(full_page=False, type='png')
-        screenshot_b64 = base64.standard_b64encode(screenshot_bytes).decode('utf-8')
-
-        screenshot_hash = hashlib.md5(screenshot_bytes).hexdigest()[:8]
-        if screenshot_hash in self.analysis_cache:
-            console.print("[yellow]   Using cached Vision analysis[/yellow]")
-            self.logger.log_info("Using cached vision analysis")
-            return self.analysis_cache[screenshot_hash]
-
-        prompt = """You are analyzing a web application to help an automated testing agent explore it systematically.
+# Upper bound on cached analyses (state keys and thumbnail keys combined)
+ANALYSIS_CACHE_MAX = 256
+
+# Concurrent vision requests allowed in flight (keeps us inside OpenAI TPM limits)
+MAX_CONCURRENT_VISION_CALLS = 8
+
+# Scroll a container and resolve once scrollTop has held still for one frame
+# (two requestAnimationFrame ticks), instead of sleeping a fixed interval.
+# Capped at the old 500ms sleep for pages that never stop animating and
+# background tabs where rAF is throttled
+_SCROLL_AND_SETTLE_JS = """
+(el, toBottom) => new Promise(resolve => {
+    el.scrollTop = toBottom ? el.scrollHeight : 0;
+    let done = false;
+    const finish = settled => { done = true; resolve(settled); };
+    setTimeout(() => finish(false), 500);
+    let last = -1;
+    const check = () => requestAnimationFrame(() => requestAnimationFrame(() => {
+        if (done) return;
+        if (el.scrollTop === last) return finish(true);
+        last = el.scrollTop;
+        check();
+    }));
+    check();
+})
+"""
+
+# Static page-analysis prompt; built once at import instead of per call
+_PAGE_ANALYSIS_PROMPT = """You are analyzing a web application to help an automated testing agent explore it systematically.
 
 **YOUR MISSION:**
 Identify ALL interactive elements and classify them into two categories:
@@ -296,6 +153,243 @@ Return JSON in this EXACT format:
 
 Return valid JSON only."""
 
+# Pre-built text part of the page-analysis message (never mutated)
+_PAGE_ANALYSIS_TEXT_PART = {"type": "text", "text": _PAGE_ANALYSIS_PROMPT}
+
+# Expanded-container prompt split around the only interpolated value
+_EXPANDED_PROMPT_PREFIX = 'You are analyzing an EXPANDED menu container titled "'
+_EXPANDED_PROMPT_SUFFIX = '''".
+
+    **IMPORTANT:** You are receiving MULTIPLE screenshots of the same menu at different scroll positions.
+    Your job is to identify ALL unique child items across ALL screenshots.
+
+    Look for:
+    - Menu items (links)
+    - Sub-sections
+    - Buttons
+
+    Return ONLY the child items you see, in this format:
+
+    {
+    "page_type": "expanded_menu",
+    "containers": [],
+    "features": [
+        {
+        "text": "EXACT text from screen",
+        "type": "link|button",
+        "location": "sidebar_child",
+        "test_priority": 8,
+        "expected_behavior": "Navigate to sub-page"
+        }
+    ],
+    "discovery_strategy": {
+        "recommended_order": [],
+        "reasoning": "All items discovered from expanded menu"
+    }
+    }
+
+    **CRITICAL:** Copy text EXACTLY character-by-character. Do NOT translate or paraphrase.'''
+
+_VISION_MODEL = "gpt-4o-mini"
+
+# JPEG q85 is visually lossless for UI captures and several times smaller than PNG
+_SCREENSHOT_QUALITY = 85
+_DATA_URL_PREFIX = b"data:image/jpeg;base64,"
+
+# Optional ```json ... ``` fence around a model reply; group 1 is the payload
+_FENCE_RE = re.compile(r'^\s*```(?:json)?\s*\n(.*?)\n\s*```\s*$', re.DOTALL)
+
+
+def _parse_vision_json(vision_text: str) -> Dict:
+    """Strip an optional markdown fence in one regex pass and parse the JSON"""
+    m = _FENCE_RE.match(vision_text)
+    return orjson.loads(m.group(1) if m else vision_text)
+
+
+class GPTVisionAnalyzer:
+    def __init__(self, openai_client: OpenAI, logger: CrawlerLogger):
+        self.client = openai_client
+        self.analysis_cache: OrderedDict = OrderedDict()
+        self.logger = logger
+        self._vision_slots = asyncio.Semaphore(MAX_CONCURRENT_VISION_CALLS)
+
+    async def _create_completion(self, **kwargs):
+        """Run the blocking OpenAI call in a worker thread so analyses can be gathered"""
+        async with self._vision_slots:
+            return await asyncio.to_thread(self.client.chat.completions.create, **kwargs)
+
+    def _cache_get(self, key) -> Optional[Dict]:
+        """Return a cached analysis and mark it most recently used"""
+        analysis = self.analysis_cache.get(key)
+        if analysis is not None:
+            self.analysis_cache.move_to_end(key)
+        return analysis
+
+    def _cache_put(self, key, analysis: Dict):
+        """Insert an analysis, evicting the least recently used entry when full"""
+        self.analysis_cache[key] = analysis
+        self.analysis_cache.move_to_end(key)
+        if len(self.analysis_cache) > ANALYSIS_CACHE_MAX:
+            self.analysis_cache.popitem(last=False)
+
+    @staticmethod
+    def _thumbnail_key(screenshot_bytes: bytes) -> str:
+        """Hash a 32x32 grayscale thumbnail so near-identical renders share a key"""
+        try:
+            with Image.open(io.BytesIO(screenshot_bytes)) as img:
+                thumb = img.convert('L').resize((32, 32)).tobytes()
+        except Exception:
+            thumb = screenshot_bytes
+        return hashlib.blake2b(thumb, digest_size=8).hexdigest()
+    
+    async def analyze_expanded_container(self, page: Page, url: str, container_text: str) -> Dict:
+        """
+        Analyze an expanded container with scrolling to capture ALL children.
+        Takes multiple screenshots at different scroll positions.
+        """
+        console.print(f"[cyan]📸 VISION: Analyzing expanded container '{container_text}' with scroll...[/cyan]")
+        self.logger.log_info(f"Starting expanded container analysis for: {container_text}")
+
+        screenshots = []
+        menu_el = None
+        
+        try:
+            # Find the expanded menu container - ADJUST THIS SELECTOR FOR YOUR APP!
+            menu_selector = '.fuse-vertical-navigation-item-children'
+            
+            # Resolve the container once and reuse the handle for every scroll op
+            menu_el = await page.query_selector(menu_selector)
+            
+            # Check if element exists and is scrollable
+            is_scrollable = bool(menu_el) and await menu_el.evaluate('el => el.scrollHeight > el.clientHeight')
+            
+            if is_scrollable:
+                console.print("[yellow]   📜 Menu is scrollable - taking multiple screenshots[/yellow]")
+                
+                # Scroll to BOTTOM and capture
+                await menu_el.evaluate(_SCROLL_AND_SETTLE_JS, True)
+                screenshot_bottom = await page.screenshot(full_page=False, type='jpeg', quality=_SCREENSHOT_QUALITY)
+                screenshots.append(screenshot_bottom)
+                
+                # Scroll to TOP and capture
+                await menu_el.evaluate(_SCROLL_AND_SETTLE_JS, False)
+                screenshot_top = await page.screenshot(full_page=False, type='jpeg', quality=_SCREENSHOT_QUALITY)
+                screenshots.append(screenshot_top)
+                
+            else:
+                console.print("[yellow]   📄 Menu not scrollable - taking single screenshot[/yellow]")
+                screenshot = await page.screenshot(full_page=False, type='jpeg', quality=_SCREENSHOT_QUALITY)
+                screenshots.append(screenshot)
+                
+        except Exception as e:
+            console.print(f"[red]   ⚠️ Scroll failed, using single screenshot: {e}[/red]")
+            screenshot = await page.screenshot(full_page=False, type='jpeg', quality=_SCREENSHOT_QUALITY)
+            screenshots = [screenshot]
+        finally:
+            # Handles pin their node until disposed; release it once scrolling is done
+            if menu_el is not None:
+                try:
+                    await menu_el.dispose()
+                except Exception:
+                    pass
+
+        # Now send ALL screenshots to vision model
+        # Build each data URL as bytes and decode once (base64 is pure ASCII);
+        # drop each raw screenshot as soon as it is encoded
+        image_urls = []
+        while screenshots:
+            screenshot_bytes = screenshots.pop(0)
+            image_urls.append((_DATA_URL_PREFIX + base64.b64encode(screenshot_bytes)).decode('ascii'))
+
+        try:
+            # Build message content with all screenshots
+            prompt = _EXPANDED_PROMPT_PREFIX + container_text + _EXPANDED_PROMPT_SUFFIX
+            message_content = [{"type": "text", "text": prompt}]
+            for img_url in image_urls:
+                message_content.append({
+                    "type": "image_url",
+                    "image_url": {"url": img_url}
+                })
+
+            response = await self._create_completion(
+                model=_VISION_MODEL,
+                messages=[{
+                    "role": "user",
+                    "content": message_content
+                }],
+                max_tokens=4000
+            )
+#             response = self.client.messages.create(
+#     model="claude-sonnet-4-20250514",
+#     max_tokens=1500,
+#     messages=[{
+#         "role": "user",
+#         "content": [
+#             {"type": "image", "source": {
+#                 "type": "base64",
+#                 "media_type": "image/png",
+#                 "data": screenshot_b64
+#             }},
+#             {"type": "text", "text": prompt}
+#         ]
+#     }]
+# )
+            vision_text = response.choices[0].message.content
+
+            # vision_text = response.content[0].text
+            
+            console.print("\n" + "="*80)
+            console.print(f"EXPANDED CONTAINER VISION RESPONSE ({container_text}):")
+            console.print(vision_text)
+            console.print("="*80 + "\n")
+
+            analysis = _parse_vision_json(vision_text)
+            
+            console.print(f"[green]   ✅ Found {len(analysis.get('features', []))} children in '{container_text}'[/green]")
+            
+            return analysis
+
+        except Exception as e:
+            console.print(f"[red]   ❌ Expanded container analysis failed: {e}[/red]")
+            self.logger.log_error("expanded_container_analysis_failed", str(e))
+            return {
+                "page_type": "expanded_menu",
+                "containers": [],
+                "features": [],
+                "discovery_strategy": {"recommended_order": [], "reasoning": "Analysis failed"}
+            }
+    async def capture_screenshot(self, page: Page) -> bytes:
+        """Viewport screenshot in the format analyze_page expects"""
+        return await page.screenshot(full_page=False, type='jpeg', quality=_SCREENSHOT_QUALITY)
+
+    async def analyze_page(self, page: Page, url: str, state_hash: Optional[str] = None,
+                           screenshot_bytes: Optional[bytes] = None) -> Dict:
+        # Known (url, state) pairs skip the screenshot entirely
+        state_key = (url, state_hash) if state_hash else None
+        cached = self._cache_get(state_key) if state_key else None
+        if cached is not None:
+            console.print("[yellow]   Using cached Vision analysis[/yellow]")
+            self.logger.log_info("Using cached vision analysis (state hash)")
+            return cached
+
+        console.print("[cyan]📸 VISION: Taking screenshot and analyzing with GPT-4...[/cyan]")
+        self.logger.log_info(f"Starting vision analysis for: {url}")
+
+        if screenshot_bytes is None:
+            screenshot_bytes = await self.capture_screenshot(page)
+
+        # Fallback dedupe: different URLs/states that render identically
+        screenshot_hash = self._thumbnail_key(screenshot_bytes)
+        cached = self._cache_get(screenshot_hash)
+        if cached is not None:
+            console.print("[yellow]   Using cached Vision analysis[/yellow]")
+            self.logger.log_info("Using cached vision analysis")
+            if state_key:
+                self._cache_put(state_key, cached)
+            return cached
+
+        image_url = (_DATA_URL_PREFIX + base64.b64encode(screenshot_bytes)).decode('ascii')
+
         try:
 #             response = self.client.messages.create(
 #     model="claude-sonnet-4-20250514",
@@ -315,18 +409,18 @@ Return valid JSON only."""
 
 #             vision_text = response.content[0].text
 
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
+            response = await self._create_completion(
+                model=_VISION_MODEL,
                 temperature=0,
                 messages=[
                     {
                         "role": "user",
                         "content": [
-                            {"type": "text", "text": prompt},
+                            _PAGE_ANALYSIS_TEXT_PART,
                             {
                                 "type": "image_url",
                                 "image_url": {
-                                    "url": f"data:image/png;base64,{screenshot_b64}"
+                                    "url": image_url
                                 }
                             }
                         ]
@@ -345,13 +439,10 @@ Return valid JSON only."""
             self.logger.log_info("Raw GPT-4 Vision Response:")
             self.logger.log_info(vision_text)
 
-            if vision_text.startswith('```'):
-                vision_text = vision_text.split('\n', 1)[1].rsplit('\n', 1)[0]
-                if vision_text.startswith('json'):
-                    vision_text = vision_text[4:].strip()
-
-            analysis = json.loads(vision_text)
-            self.analysis_cache[screenshot_hash] = analysis
+            analysis = _parse_vision_json(vision_text)
+            self._cache_put(screenshot_hash, analysis)
+            if state_key:
+                self._cache_put(state_key, analysis)
             
             # Log the analysis
             self.logger.log_vision_analysis(url, analysis)
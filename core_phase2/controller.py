@@ -3,40 +3,110 @@ import asyncio
 import json
 import base64
 import hashlib
+import re
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, Dict, List, Any, Tuple, Set
 from urllib.parse import urlparse, urljoin
 from dataclasses import dataclass, field
-from enum import Enum
 
 from playwright.async_api import async_playwright, Page, Locator, FrameLocator
 from openai import OpenAI
 
 
-class ContextType(Enum):
-    PAGE = "page"
-    MODAL = "modal"
-    FORM = "form"
-    DROPDOWN = "dropdown"
-    TABLE = "table"
-    CONFIRMATION = "confirmation"
+# 1/0 "has a match" flag for each CSS selector (optionally scoped to an overlay)
+# in one round-trip; querySelector stops at the first match instead of
+# enumerating them all. Open shadow roots are searched too, as Playwright's CSS
+# engine does, so a 0 here means the locator would miss as well. Invalid
+# selectors report 0
+_BATCH_EXISTS_JS = """
+([scope, sels]) => {
+    const roots = scope ? Array.from(document.querySelectorAll(scope)) : [document];
+    for (let i = 0; i < roots.length; i++) {
+        for (const el of roots[i].querySelectorAll('*')) {
+            if (el.shadowRoot) roots.push(el.shadowRoot);
+        }
+    }
+    return sels.map(s => {
+        try { return roots.some(r => r.querySelector(s) !== null) ? 1 : 0; }
+        catch (e) { return 0; }
+    });
+}
+"""
+
+# Approximate accessible name per element (aria-label, else whitespace-collapsed text)
+_ACCESSIBLE_NAMES_JS = """
+els => els.map(e => (e.getAttribute('aria-label') || e.textContent || '').replace(/\\s+/g, ' ').trim())
+"""
+
+# Text-based custom-select fallbacks checked in one round-trip, in priority order:
+# a mat-select whose mat-form-field has a matching mat-label, then a combobox
+# containing the text (case-insensitive substring, like Playwright's has-text)
+_CUSTOM_SELECT_TEXT_JS = """
+([scope, target]) => {
+    const norm = s => (s || '').replace(/\\s+/g, ' ').trim().toLowerCase();
+    const t = norm(target);
+    const roots = scope ? Array.from(document.querySelectorAll(scope)) : [document];
+    const within = sel => roots.flatMap(r => Array.from(r.querySelectorAll(sel)));
+    if (within('mat-form-field').some(ff => ff.querySelector('mat-select') &&
+            Array.from(ff.querySelectorAll('mat-label')).some(l => norm(l.textContent).includes(t))))
+        return 'mat-label';
+    if (within('[role="combobox"]').some(cb => norm(cb.textContent).includes(t)))
+        return 'combobox-text';
+    return null;
+}
+"""
+
+# Targets shaped like an HTML id ("userEmail", "btn-submit") try the id lookup first
+_ID_RE = re.compile(r'^[A-Za-z][\w-]*$')
+
+# Lookup tables for the locator strategies (built once, not per call)
+_ROLE_MAP = {
+    'button': 'button', 'link': 'link',
+    'checkbox': 'checkbox', 'radio': 'radio',
+    'textbox': 'textbox', 'input': 'textbox'
+}
+_TAG_MAP = {
+    'button': 'button', 'link': 'a',
+    'input': 'input', 'select': 'select', 'textarea': 'textarea'
+}
+_TEXT_FALLBACK_TAGS = ('button', 'a', 'input', 'select', 'textarea')
+_CUSTOM_SELECT_TAGS = ('mat-select', 'ng-select', '[role="combobox"]', '')
+_FORMCONTROL_TAGS = ('input', 'textarea', 'select', 'mat-select', 'ng-select', '')
+
+# Selector templates; {q} is the target as an already-quoted CSS string
+_FCN_TEMPLATES = tuple(tag + "[formcontrolname={q}]" for tag in _FORMCONTROL_TAGS)
+_CUSTOM_SELECT_TEMPLATES = tuple(tag + "[formcontrolname={q}]" for tag in _CUSTOM_SELECT_TAGS) + (
+    'mat-select[aria-label={q}]',
+    'ng-select[aria-label={q}]',
+    '[role="combobox"][aria-label={q}]',
+)
+
+
+def _css_string(value: str) -> str:
+    """Quote value as a CSS string literal so quotes/backslashes can't break a selector"""
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\a ') + '"'
 
 
-@dataclass
 class Controller:
 
     def __init__(self, page: Page):
         self.page = page
+        # (target, elem_type, overlay) -> (locator, method), valid for one DOM hash
+        self._find_cache: Dict[Tuple[str, str, str], Tuple[Locator, str]] = {}
+        self._find_cache_dom_hash: Optional[str] = None
 
     async def find(
         self,
         intent: Dict,
-        overlay_selector: Optional[str] = None
+        overlay_selector: Optional[str] = None,
+        dom_hash: Optional[str] = None
     ) -> Tuple[Optional[Locator], str]:
         """
         Find element based on intent.
         When overlay_selector is provided, scope search to that container.
+        When dom_hash is provided, results are reused until the DOM hash changes.
         """
         target    = intent.get('target_name', '')
         elem_type = intent.get('element_type', '')
@@ -47,119 +117,202 @@ class Controller:
         print(f"  🔍 Finding: '{target}' ({elem_type})"
               + (f" [scoped to: {overlay_selector}]" if overlay_selector else ""))
 
+        if dom_hash != self._find_cache_dom_hash:
+            self._find_cache.clear()
+            self._find_cache_dom_hash = dom_hash
+        cache_key = (target, elem_type, overlay_selector or '')
+        if dom_hash is not None and cache_key in self._find_cache:
+            loc, method = self._find_cache[cache_key]
+            try:
+                if await self._exists(loc):
+                    return loc, method
+            except Exception:
+                pass
+            del self._find_cache[cache_key]
+
         root = self.page.locator(overlay_selector) if overlay_selector else self.page
 
+        # Probe every plain-CSS candidate in a single evaluate instead of one
+        # round-trip per selector
+        css = [*self._formcontrolname_selectors(target), self._id_selector(target)]
         if elem_type == 'custom-select':
-            loc = await self._by_custom_select(target, root)
-            if loc:
-                return loc, "custom-select"
-            loc = await self._by_formcontrolname(target, root)
-            if loc:
-                return loc, "formcontrolname"
-            return None, "Not found"
-
-        # if elem_type in ['button', 'link', 'checkbox', 'radio', 'textbox']:
-        #     loc = await self._by_role(target, elem_type, root)
-        #     if loc:
-        #         return loc, "role"
-        
-        loc = await self._by_role(target, elem_type, root)
-        if loc:
-            return loc, "role"
-        if elem_type in ['input', 'textbox', 'select', 'textarea']:
-            loc = await self._by_placeholder_label(target, root)
-            if loc:
-                return loc, "placeholder/label"
-
-        loc = await self._by_formcontrolname(target, root)
-        if loc:
-            return loc, "formcontrolname"
-
-        loc = await self._by_text_interactive(target, elem_type, root)
-        if loc:
-            return loc, "text"
-
-        loc = await self._by_id(target, root)
-        if loc:
+            css = list(dict.fromkeys([*self._custom_select_selectors(target), *css]))
+        hits = await self._batch_exists(css, overlay_selector)
+
+        # An id-shaped target that exists as an id is the cheapest, most precise
+        # hit; the batched probe already answered it, so return without more probes.
+        # Custom selects keep their own resolution path
+        id_sel = self._id_selector(target)
+        if elem_type != 'custom-select' and hits.get(id_sel) and _ID_RE.match(target):
+            loc = root.locator(id_sel).first
+            print(f"    ✓ Found by ID: #{target}")
+            if dom_hash is not None:
+                self._find_cache[cache_key] = (loc, "id")
             return loc, "id"
 
-        loc = await self._by_partial_text_interactive(target, elem_type, root)
-        if loc:
-            return loc, "partial_text"
+        # Strategies in priority order, each tagged with the DOM queries it covers.
+        # One whose queries were all covered by an earlier strategy can never win,
+        # so it is not run at all. Strategies leave their "found" line in notes
+        # under their label; only the winner's is printed
+        notes: Dict[str, str] = {}
+        if elem_type == 'custom-select':
+            # [formcontrolname='X'] in the custom-select list subsumes every tag variant
+            plan = [
+                ("custom-select", ("fcn",), lambda: self._by_custom_select(target, root, hits, notes, overlay_selector)),
+                ("formcontrolname", ("fcn",), lambda: self._by_formcontrolname(target, root, hits, notes)),
+            ]
+        else:
+            text_tag = _TAG_MAP.get(elem_type)
+            text_keys = (text_tag,) if text_tag else _TEXT_FALLBACK_TAGS
+            plan = [("role", ("role",), lambda: self._by_role(target, elem_type, root))]
+            if elem_type in ['input', 'textbox', 'select', 'textarea']:
+                plan.append(("placeholder/label", ("placeholder/label",),
+                             lambda: self._by_placeholder_label(target, root)))
+            plan += [
+                ("formcontrolname", ("fcn",), lambda: self._by_formcontrolname(target, root, hits, notes)),
+                ("text", text_keys, lambda: self._by_text_interactive(target, elem_type, root)),
+                ("id", ("id",), lambda: self._by_id(target, root, hits, notes)),
+                ("partial_text", (text_tag or 'button',),
+                 lambda: self._by_partial_text_interactive(target, elem_type, root)),
+            ]
+
+        seen = set()
+        strategies = []
+        for label, keys, make in plan:
+            if seen.issuperset(keys):
+                continue
+            seen.update(keys)
+            strategies.append((label, make()))
+
+        # Each remaining strategy is an independent CDP probe, so run them
+        # concurrently and keep the highest-priority hit
+
+        results = await asyncio.gather(
+            *(coro for _, coro in strategies), return_exceptions=True
+        )
+        for (label, _), loc in zip(strategies, results):
+            if loc and not isinstance(loc, BaseException):
+                if label in notes:
+                    print(notes[label])
+                if dom_hash is not None:
+                    self._find_cache[cache_key] = (loc, label)
+                return loc, label
 
         return None, "Not found"
 
-    async def _by_custom_select(self, target: str, root) -> Optional[Locator]:
-        for tag in ['mat-select', 'ng-select', '[role="combobox"]', '']:
-            sel = (f"{tag}[formcontrolname='{target}']"
-                   if tag else f"[formcontrolname='{target}']")
+    async def _batch_exists(self, selectors: List[str],
+                           overlay_selector: Optional[str]) -> Dict[str, int]:
+        """1/0 match flags for CSS selectors from one page.evaluate round-trip"""
+        try:
+            hits = await self.page.evaluate(_BATCH_EXISTS_JS, [overlay_selector, selectors])
+            return dict(zip(selectors, hits))
+        except Exception:
+            return {}
+
+    async def _exists(self, loc: Locator) -> bool:
+        """True if loc has at least one match, without counting every match"""
+        return await loc.first.count() > 0
+
+    async def _css_hit(self, root, sel: str, hits: Dict[str, int]) -> Optional[Locator]:
+        """First match for sel, using the batched flag (probes only if it is missing)"""
+        loc = root.locator(sel)
+        hit = hits.get(sel)
+        if hit is None:
+            hit = await self._exists(loc)
+        return loc.first if hit else None
+
+    async def _first_css_hit(self, root, sels: Tuple[str, ...],
+                             hits: Dict[str, int]) -> Tuple[Optional[Locator], str]:
+        """First selector in priority order that matched, plus the selector itself"""
+        if any(sel not in hits for sel in sels):
+            # No batched flags: one comma-union probe rules out every selector at once
+            union = ", ".join(sels)
             try:
-                loc = root.locator(sel)
-                if await loc.count() > 0:
-                    print(f"    ✓ Found custom-select by formcontrolname: {target}")
-                    return loc.first
+                if not await self._exists(root.locator(union)):
+                    return None, ''
             except Exception:
                 pass
-
-        for sel in [
-            f'mat-select[aria-label="{target}"]',
-            f'ng-select[aria-label="{target}"]',
-            f'[role="combobox"][aria-label="{target}"]',
-        ]:
+        for sel in sels:
             try:
-                loc = root.locator(sel)
-                if await loc.count() > 0:
-                    print(f"    ✓ Found custom-select by aria-label: {target}")
-                    return loc.first
+                loc = await self._css_hit(root, sel, hits)
+                if loc:
+                    return loc, sel
             except Exception:
                 pass
-
-        try:
-            loc = root.get_by_role('combobox', name=target, exact=False)
-            if await loc.count() > 0:
-                print(f"    ✓ Found custom-select by role=combobox name: {target}")
-                return loc.first
-        except Exception:
-            pass
-
-        try:
-            loc = root.locator('mat-form-field').filter(
-                has=self.page.locator(f'mat-label:has-text("{target}")')
-            ).locator('mat-select')
-            if await loc.count() > 0:
-                print(f"    ✓ Found mat-select by mat-label: {target}")
-                return loc.first
-        except Exception:
-            pass
-
-        try:
-            loc = root.locator(
-                f'[role="combobox"]'
-            ).filter(has_text=target)
-            if await loc.count() > 0:
-                print(f"    ✓ Found [role=combobox] by text: {target}")
-                return loc.first
-        except Exception:
-            pass
+        return None, ''
+
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def _custom_select_selectors(target: str) -> Tuple[str, ...]:
+        q = _css_string(target)
+        return tuple(t.format(q=q) for t in _CUSTOM_SELECT_TEMPLATES)
+
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def _formcontrolname_selectors(text: str) -> Tuple[str, ...]:
+        q = _css_string(text)
+        return tuple(t.format(q=q) for t in _FCN_TEMPLATES)
+
+    @staticmethod
+    def _id_selector(id_value: str) -> str:
+        # Attribute form: ids starting with a digit or holding punctuation are
+        # not valid after '#'
+        return f"[id={_css_string(id_value)}]"
+
+    async def _by_custom_select(self, target: str, root, hits: Dict[str, int],
+                                notes: Dict[str, str],
+                                overlay_selector: Optional[str] = None) -> Optional[Locator]:
+        loc, sel = await self._first_css_hit(root, self._custom_select_selectors(target), hits)
+        if loc:
+            how = "aria-label" if "aria-label" in sel else "formcontrolname"
+            notes['custom-select'] = f"    ✓ Found custom-select by {how}: {target}"
+            return loc
+
+        # Remaining fallbacks: the accessible-name probe needs Playwright's engine,
+        # the two text-based ones are answered together by one evaluate
+        role_loc = root.get_by_role('combobox', name=target, exact=False)
+        role_hit, text_hit = await asyncio.gather(
+            self._exists(role_loc),
+            self.page.evaluate(_CUSTOM_SELECT_TEXT_JS, [overlay_selector, target]),
+            return_exceptions=True
+        )
+
+        if role_hit is True:
+            notes['custom-select'] = f"    ✓ Found custom-select by role=combobox name: {target}"
+            return role_loc.first
+
+        if text_hit == 'mat-label':
+            notes['custom-select'] = f"    ✓ Found mat-select by mat-label: {target}"
+            return root.locator('mat-form-field').filter(
+                has=self.page.locator(f'mat-label:has-text({_css_string(target)})')
+            ).locator('mat-select').first
+
+        if text_hit == 'combobox-text':
+            notes['custom-select'] = f"    ✓ Found [role=combobox] by text: {target}"
+            return root.locator('[role="combobox"]').filter(has_text=target).first
 
         return None
 
     async def _by_role(self, name: str, role: str, root) -> Optional[Locator]:
         try:
-            role_map = {
-                'button': 'button', 'link': 'link',
-                'checkbox': 'checkbox', 'radio': 'radio',
-                'textbox': 'textbox', 'input': 'textbox'
-            }
-            aria_role = role_map.get(role, role)
-
-            loc = root.get_by_role(aria_role, name=name, exact=True)
-            if await loc.count() > 0:
-                return loc.first
+            aria_role = _ROLE_MAP.get(role, role)
 
+            # exact=False is a superset of exact=True: probe once, then prefer an
+            # exact name match among the candidates in a single extra round-trip
             loc = root.get_by_role(aria_role, name=name, exact=False)
-            if await loc.count() > 0:
-                return loc.first
+            n = await loc.count()
+            if n == 0:
+                return None
+            if n > 1:
+                names = await loc.evaluate_all(_ACCESSIBLE_NAMES_JS)
+                if name in names:
+                    return loc.nth(names.index(name))
+                # The approximation misses names from <label>/placeholder, so
+                # let Playwright's own exact match decide before taking the first
+                exact = root.get_by_role(aria_role, name=name, exact=True)
+                if await self._exists(exact):
+                    return exact.first
+            return loc.first
         except Exception:
             pass
         return None
@@ -167,76 +320,64 @@ class Controller:
     async def _by_placeholder_label(self, text: str, root) -> Optional[Locator]:
         try:
             loc = root.get_by_placeholder(text, exact=True)
-            if await loc.count() > 0:
+            if await self._exists(loc):
                 return loc.first
 
             loc = root.get_by_placeholder(text, exact=False)
-            if await loc.count() > 0:
+            if await self._exists(loc):
                 return loc.first
 
             loc = root.get_by_label(text, exact=False)
-            if await loc.count() > 0:
+            if await self._exists(loc):
                 return loc.first
         except Exception:
             pass
         return None
 
-    async def _by_formcontrolname(self, text: str, root) -> Optional[Locator]:
-        for tag in ['input', 'textarea', 'select', 'mat-select', 'ng-select', '']:
-            selector = (f"{tag}[formcontrolname='{text}']"
-                        if tag else f"[formcontrolname='{text}']")
-            try:
-                loc = root.locator(selector)
-                if await loc.count() > 0:
-                    print(f"    ✓ Found by formcontrolname ({tag or 'any'}): {text}")
-                    return loc.first
-            except Exception:
-                pass
-        return None
+    async def _by_formcontrolname(self, text: str, root, hits: Dict[str, int],
+                                  notes: Dict[str, str]) -> Optional[Locator]:
+        loc, selector = await self._first_css_hit(root, self._formcontrolname_selectors(text), hits)
+        if loc:
+            tag = selector.split('[', 1)[0]
+            notes['formcontrolname'] = f"    ✓ Found by formcontrolname ({tag or 'any'}): {text}"
+        return loc
 
     async def _by_text_interactive(self, text: str, elem_type: str, root) -> Optional[Locator]:
-        tag_map = {
-            'button': 'button', 'link': 'a',
-            'input': 'input', 'select': 'select', 'textarea': 'textarea'
-        }
-        tag = tag_map.get(elem_type, '')
+        tag = _TAG_MAP.get(elem_type, '')
         try:
             if tag:
                 loc = root.locator(tag).filter(has_text=text)
-                if await loc.count() > 0:
+                if await self._exists(loc):
                     return loc.first
             else:
                 role_loc = root.locator(f'[role="{elem_type}"]').filter(has_text=text)
-                if await role_loc.count() > 0:
+                if await self._exists(role_loc):
                     return role_loc.first
                 # Then fall back to common tags
-                for t in ['button', 'a', 'input', 'select', 'textarea']:
+                for t in _TEXT_FALLBACK_TAGS:
                     loc = root.locator(t).filter(has_text=text)
-                    if await loc.count() > 0:
+                    if await self._exists(loc):
                         return loc.first
         except Exception:
             pass
         return None
 
-    async def _by_id(self, id_value: str, root) -> Optional[Locator]:
+    async def _by_id(self, id_value: str, root, hits: Dict[str, int],
+                     notes: Dict[str, str]) -> Optional[Locator]:
         try:
-            loc = root.locator(f"#{id_value}")
-            if await loc.count() > 0:
-                print(f"    ✓ Found by ID: #{id_value}")
-                return loc.first
+            loc = await self._css_hit(root, self._id_selector(id_value), hits)
+            if loc:
+                notes['id'] = f"    ✓ Found by ID: #{id_value}"
+                return loc
         except Exception:
             pass
         return None
 
     async def _by_partial_text_interactive(self, text: str, elem_type: str, root) -> Optional[Locator]:
-        tag_map = {
-            'button': 'button', 'link': 'a',
-            'input': 'input', 'select': 'select', 'textarea': 'textarea'
-        }
-        tag = tag_map.get(elem_type, 'button')
+        tag = _TAG_MAP.get(elem_type, 'button')
         try:
             loc = root.locator(tag).filter(has_text=text)
-            if await loc.count() > 0:
+            if await self._exists(loc):
                 return loc.first
         except Exception:
             pass
@@ -2,105 +2,23 @@ import asyncio
 import json
 import base64
 import hashlib
+import io
+from collections import deque
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, Dict, List, Any, Tuple, Set
 from urllib.parse import urlparse, urljoin
-from dataclasses import dataclass, field
-from enum import Enum
 
+import orjson
+from PIL import Image
 from playwright.async_api import async_playwright, Page, Locator, FrameLocator
-from openai import OpenAI
-
-class ContextType(Enum):
-    PAGE = "page"
-    MODAL = "modal"
-    FORM = "form"
-    DROPDOWN = "dropdown"
-    TABLE = "table"
-    CONFIRMATION = "confirmation"
-
-
-@dataclass
-class ContextFrame:
-    context_type: ContextType
-    description: str
-    timestamp: str
-    url: str
-    dom_hash: str
-    overlay_selector: Optional[str] = None
-class Decider:
-
-    def __init__(self, openai_client: OpenAI, tester_ref=None):
-        self.openai = openai_client
-        self.tester = tester_ref  # Reference to SemanticTester for history access
+from openai import AsyncOpenAI
 
-    async def decide(
-        self,
-        screenshot_b64: str,
-        context_frame: ContextFrame,
-        elements: List[Dict]
-    ) -> Dict:
-        if not elements:
-            return {"action": "done", "reasoning": "All elements tested"}
+from core_phase2.types import ContextType, ContextFrame
 
-        prompt = self._build_prompt(context_frame.context_type, elements)
 
-        try:
-            response = self.openai.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": prompt},
-                        {"type": "image_url",
-                         "image_url": {"url": f"data:image/png;base64,{screenshot_b64}"}}
-                    ]
-                }],
-                max_tokens=1500,
-                temperature=0.2
-            )
-            raw = response.choices[0].message.content
-            return json.loads(self._extract_json(raw))
-
-        except Exception as e:
-            print(f"  ⚠️  Decision failed: {e}")
-            if elements:
-                elem = elements[0]
-                return {
-                    "action": "click",
-                    "target_name": elem.get('text', 'element'),
-                    "element_type": elem.get('tag', 'button'),
-                    "reasoning": "Fallback"
-                }
-            return {"action": "wait"}
-
-    def _build_prompt(self, context_type: ContextType, elements: List[Dict]) -> str:
-        
-        # FIX 3: Add recent history context to prevent LLM hallucination
-        recent_history = []
-        if self.tester and hasattr(self.tester, 'history'):
-            recent_history = self.tester.history[-5:]
-        
-        history_summary = ""
-        if recent_history:
-            history_summary = "\n\nRECENT ACTIONS (last 5 steps):\n"
-            for h in recent_history:
-                action = h.get('decision', {}).get('action', '')
-                target = h.get('decision', {}).get('target_name', '')
-                success = h.get('result', {}).get('success', False)
-                status = "✓" if success else "✗"
-                history_summary += f"  {status} {action} → {target}\n"
-            history_summary += "\nDO NOT repeat these exact actions unless the element appears in UNTESTED list.\n"
-
-        prompt = f"""You are a QA engineer creating a realistic user test story for a web form.
-CONTEXT: {context_type.value}
-{history_summary}
-
-UNTESTED ELEMENTS ({len(elements)} remaining):
-{json.dumps(elements[:15], indent=2)}
-
-STRICT RULES — follow in this exact order:
+# Static sections of the decision prompt, built once at import
+_STATIC_RULES = """STRICT RULES — follow in this exact order:
 
 **MOST IMPORTANT RULE — READ THE SCREENSHOT CAREFULLY:**
 - The screenshot shows the CURRENT STATE of the page.
@@ -186,19 +104,16 @@ STRICT RULES — follow in this exact order:
 9. **ONLY choose from UNTESTED ELEMENTS list above** – do not hallucinate elements.
 """
 
-        if context_type == ContextType.CONFIRMATION:
-            prompt += "CURRENT CONTEXT: Confirmation — click confirm/yes unless data loss risk, then cancel.\n"
-        elif context_type == ContextType.FORM:
-            prompt += "CURRENT CONTEXT: Form — fill/select ALL fields before clicking submit. Required fields first.\n"
-        elif context_type == ContextType.MODAL:
-            prompt += "CURRENT CONTEXT: Modal — test all elements inside before closing.\n"
-        elif context_type == ContextType.TABLE:
-            prompt += "CURRENT CONTEXT: Table — fill search inputs first, click search, then row actions, then create.\n"
-        else:
-            prompt += "CURRENT CONTEXT: Page — fill/select fields before clicking their trigger buttons.\n"
-
-        prompt += """
-Return ONLY valid JSON, no markdown:
+_CONTEXT_SUFFIX: Dict[ContextType, str] = {
+    ContextType.CONFIRMATION: "CURRENT CONTEXT: Confirmation — click confirm/yes unless data loss risk, then cancel.\n",
+    ContextType.FORM: "CURRENT CONTEXT: Form — fill/select ALL fields before clicking submit. Required fields first.\n",
+    ContextType.MODAL: "CURRENT CONTEXT: Modal — test all elements inside before closing.\n",
+    ContextType.TABLE: "CURRENT CONTEXT: Table — fill search inputs first, click search, then row actions, then create.\n",
+}
+_DEFAULT_CONTEXT_SUFFIX = "CURRENT CONTEXT: Page — fill/select fields before clicking their trigger buttons.\n"
+
+_JSON_SCHEMA = """
+Respond with a JSON object in this shape:
 {
   "action": "click|fill|select|check",
   "target_name": "exact text or formcontrolname from the list",
@@ -206,15 +121,126 @@ Return ONLY valid JSON, no markdown:
   "test_value": "value if filling/selecting, empty string for clicks",
   "reasoning": "one sentence"
 }"""
-        return prompt
-
-    def _extract_json(self, text: str) -> str:
-        if "```json" in text:
-            start = text.find("```json") + 7
-            end   = text.find("```", start)
-            return text[start:end].strip()
-        if "```" in text:
-            start = text.find("```") + 3
-            end   = text.find("```", start)
-            return text[start:end].strip()
-        return text.strip()
+
+
+class Decider:
+
+    def __init__(self, openai_client: AsyncOpenAI, tester_ref=None):
+        # Async client: the LLM round-trip must not block the event loop
+        self.openai = openai_client
+        self.tester = tester_ref  # Reference to SemanticTester for history access
+        # Resolve the tester's history list once instead of hasattr() per prompt
+        self._history_ref: Optional[list] = getattr(tester_ref, 'history', None) if tester_ref else None
+        # Formatted lines for the last 5 history entries; only entries appended
+        # since the previous prompt are formatted
+        self._history_lines: deque = deque(maxlen=5)
+        self._history_seen = 0
+        # Request payload built once; decide() only swaps the text and image URL.
+        # A concurrent decide() gets its own copy while this one is in flight
+        self._msg_skeleton = self._new_messages()
+        self._msg_in_use = False
+
+    @staticmethod
+    def _new_messages() -> List[Dict]:
+        return [{
+            "role": "user",
+            "content": [
+                {"type": "text", "text": ""},
+                {"type": "image_url", "image_url": {"url": ""}}
+            ]
+        }]
+
+    async def decide(
+        self,
+        screenshot_b64: str,
+        context_frame: ContextFrame,
+        elements: List[Dict]
+    ) -> Dict:
+        if not elements:
+            return {"action": "done", "reasoning": "All elements tested"}
+
+        prompt = self._build_prompt(context_frame.context_type, elements)
+        image_url = await asyncio.to_thread(self._shrink, screenshot_b64)
+
+        shared = not self._msg_in_use
+        messages = self._msg_skeleton if shared else self._new_messages()
+        messages[0]["content"][0]["text"] = prompt
+        messages[0]["content"][1]["image_url"]["url"] = image_url
+        if shared:
+            self._msg_in_use = True
+
+        try:
+            response = await self.openai.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=messages,
+                max_tokens=1500,
+                temperature=0.2,
+                # JSON mode: the reply is a bare JSON object, no fences to strip
+                response_format={"type": "json_object"}
+            )
+            raw = response.choices[0].message.content
+            return orjson.loads(raw)
+
+        except Exception as e:
+            print(f"  ⚠️  Decision failed: {e}")
+            if elements:
+                elem = elements[0]
+                return {
+                    "action": "click",
+                    "target_name": elem.get('text', 'element'),
+                    "element_type": elem.get('tag', 'button'),
+                    "reasoning": "Fallback"
+                }
+            return {"action": "wait"}
+        finally:
+            if shared:
+                # Don't keep the last prompt/screenshot alive between calls
+                messages[0]["content"][0]["text"] = ""
+                messages[0]["content"][1]["image_url"]["url"] = ""
+                self._msg_in_use = False
+
+    @staticmethod
+    def _shrink(b64: str) -> str:
+        """Data URL of the screenshot downscaled to 1024px and re-encoded as JPEG q85"""
+        try:
+            with Image.open(io.BytesIO(base64.b64decode(b64))) as img:
+                img = img.convert('RGB')
+                img.thumbnail((1024, 1024), Image.LANCZOS)
+                buf = io.BytesIO()
+                img.save(buf, format='JPEG', quality=85)
+            return (b"data:image/jpeg;base64," + base64.b64encode(buf.getvalue())).decode('ascii')
+        except Exception:
+            return f"data:image/png;base64,{b64}"
+
+    def _build_prompt(self, context_type: ContextType, elements: List[Dict]) -> str:
+        
+        # FIX 3: Add recent history context to prevent LLM hallucination
+        history = self._history_ref if self._history_ref is not None else []
+        if len(history) < self._history_seen:  # history was reset
+            self._history_lines.clear()
+            self._history_seen = 0
+        for h in history[max(self._history_seen, len(history) - 5):]:
+            action = h.get('decision', {}).get('action', '')
+            target = h.get('decision', {}).get('target_name', '')
+            success = h.get('result', {}).get('success', False)
+            status = "✓" if success else "✗"
+            self._history_lines.append(f"  {status} {action} → {target}\n")
+        self._history_seen = len(history)
+        
+        history_summary = ""
+        if self._history_lines:
+            history_summary = (
+                "\n\nRECENT ACTIONS (last 5 steps):\n"
+                + "".join(self._history_lines)
+                + "\nDO NOT repeat these exact actions unless the element appears in UNTESTED list.\n"
+            )
+
+        return (
+            "You are a QA engineer creating a realistic user test story for a web form.\n"
+            f"CONTEXT: {context_type.value}\n{history_summary}\n\n"
+            f"UNTESTED ELEMENTS ({len(elements)} remaining):\n"
+            f"{orjson.dumps(elements[:15], option=orjson.OPT_INDENT_2).decode()}\n\n"
+            + _STATIC_RULES
+            + _CONTEXT_SUFFIX.get(context_type, _DEFAULT_CONTEXT_SUFFIX)
+            + _JSON_SCHEMA
+        )
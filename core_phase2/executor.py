@@ -1,40 +1,168 @@
 import asyncio
-import json
-import base64
-import hashlib
-from pathlib import Path
-from datetime import datetime
-from typing import Optional, Dict, List, Any, Tuple, Set
-from urllib.parse import urlparse, urljoin
-from dataclasses import dataclass, field
-from enum import Enum
-
-from playwright.async_api import async_playwright, Page, Locator, FrameLocator
-from openai import OpenAI
-
-
-
-class ContextType(Enum):
-    PAGE = "page"
-    MODAL = "modal"
-    FORM = "form"
-    DROPDOWN = "dropdown"
-    TABLE = "table"
-    CONFIRMATION = "confirmation"
-
-
-@dataclass
-class ContextFrame:
-    context_type: ContextType
-    description: str
-    timestamp: str
-    url: str
-    dom_hash: str
-    overlay_selector: Optional[str] = None
+import re
+from typing import Optional, Dict, List, Any
+
+from playwright.async_api import Page, Locator
+
+from core_phase2.controller import _css_string
+
+
+_OPTION_CONTAINER_SELECTORS = [
+    # Angular Material (most specific first)
+    '.mat-mdc-option',
+    'mat-option',
+    # ARIA roles
+    '[role="option"]',
+    # PrimeNG
+    '.p-dropdown-item',
+    '.p-multiselect-item',
+    # Ant Design
+    '.ant-select-item-option',
+    # ng-select
+    '.ng-option',
+    # Vue Select
+    '.vs__dropdown-option',
+    # React Select
+    '.react-select__option',
+    # Generic overlay containers
+    '.cdk-overlay-container mat-option',
+    '.cdk-overlay-container [role="option"]',
+    '.cdk-overlay-pane mat-option',
+    '.dropdown-item',
+    # Last resort - any visible li in overlay
+    '.cdk-overlay-container li',
+]
+_OPTION_UNION_SELECTOR = ", ".join(_OPTION_CONTAINER_SELECTORS)
+# Only options currently shown; stale hidden ones from closed panels don't count
+_VISIBLE_OPTION_SELECTOR = ", ".join(f"{sel}:visible" for sel in _OPTION_CONTAINER_SELECTORS)
+
+# Option kinds probed for an exact value match, in priority order
+_VALUE_OPTION_SELECTORS = (
+    'mat-option',
+    '.p-dropdown-item',
+    '.p-multiselect-item',
+    '.ant-select-item-option',
+    '.ng-option',
+    '.vs__dropdown-option',
+    '.react-select__option',
+    '[role="option"]',
+    '[role="listbox"] li',
+    '.cdk-overlay-container li',
+    '.dropdown-item',
+)
+_VALUE_OPTION_UNION = f":is({', '.join(_VALUE_OPTION_SELECTORS)})"
+
+# For each union match: priority of the first selector it satisfies plus the
+# fields needed to rule out search inputs and hidden nodes
+_RANK_OPTIONS_JS = """
+(els, sels) => els.map(el => ({
+    rank: sels.findIndex(s => el.matches(s)),
+    text: (el.innerText || '').trim(),
+    hasInput: el.querySelector('input') !== null,
+    classes: el.getAttribute('class') || '',
+    visible: el.getBoundingClientRect().width > 0 && el.offsetParent !== null
+}))
+"""
+
+# Read every candidate option for each container selector in one round-trip;
+# one list per selector (empty when it matches nothing or is invalid). Run over
+# the union locator so Playwright's engine supplies the elements, open shadow
+# roots included, in the same order locator(sel).nth(i) uses
+_READ_OPTIONS_JS = """
+(els, sels) => sels.map(sel => {
+    let matched;
+    try { matched = els.filter(el => el.matches(sel)); } catch (e) { return []; }
+    return matched.map(el => ({
+        text: (el.innerText || '').trim(),
+        hasInput: el.querySelector('input') !== null,
+        classes: el.getAttribute('class') || '',
+        visible: el.getBoundingClientRect().width > 0 && el.offsetParent !== null
+    }));
+})
+"""
+
+# Registered once per page so each call ships a one-line reference instead of
+# the full body; the fallback covers documents the helper never reached
+_EXECUTOR_HELPERS_JS = """
+window.__isDisabled = el => el.disabled ||
+    el.getAttribute('aria-disabled') === 'true' ||
+    el.classList.contains('mat-mdc-button-disabled');
+window.__waitForOverlay = (sels, timeout) => new Promise((res, rej) => {
+    const ready = () => Array.from(document.querySelectorAll(sels)).some(el => el.offsetParent !== null);
+    if (ready()) return res(true);
+    const obs = new MutationObserver(() => {
+        if (ready()) { obs.disconnect(); clearTimeout(timer); res(true); }
+    });
+    const timer = setTimeout(() => { obs.disconnect(); rej(new Error('overlay timeout')); }, timeout);
+    obs.observe(document.body, {
+        childList: true, subtree: true,
+        attributes: true, attributeFilter: ['class', 'style', 'hidden']
+    });
+});
+window.__waitForQuiet = (quiet, cap) => new Promise(res => {
+    let quietTimer = null;
+    const done = () => { obs.disconnect(); clearTimeout(quietTimer); clearTimeout(capTimer); res(true); };
+    const obs = new MutationObserver(() => {
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(done, quiet);
+    });
+    const capTimer = setTimeout(done, cap);
+    quietTimer = setTimeout(done, quiet);
+    obs.observe(document.body || document.documentElement, {
+        childList: true, subtree: true, attributes: true, characterData: true
+    });
+});
+"""
+# Same helpers for a document already loaded; a function, so Playwright runs
+# the body instead of invoking whatever the last assignment evaluates to
+_INSTALL_EXECUTOR_HELPERS_JS = f"() => {{ {_EXECUTOR_HELPERS_JS.strip()} }}"
+_IS_DISABLED_JS = "el => window.__isDisabled ? window.__isDisabled(el) : el.disabled"
+
+# Resolves as soon as the button enables, rather than polling from Python
+_IS_ENABLED_JS = "el => !(window.__isDisabled ? window.__isDisabled(el) : el.disabled)"
+
+# Resolves when an option overlay has actually rendered (mutation-driven)
+_WAIT_FOR_OVERLAY_JS = "([s, t]) => window.__waitForOverlay ? window.__waitForOverlay(s, t) : true"
+
+# Resolves once the DOM has gone [quiet] ms without mutations, at most [cap] ms
+_WAIT_FOR_QUIET_JS = "([q, c]) => window.__waitForQuiet ? window.__waitForQuiet(q, c) : true"
+
+# Buttons worth waiting on when they start out disabled
+SUBMIT_KEYWORDS = ("simpan", "save", "submit", "tambah", "perbarui", "update", "cari", "search")
+_SUBMIT_RE = re.compile("|".join(SUBMIT_KEYWORDS), re.IGNORECASE)
+
+_SEARCH_CLASS_HINTS = ('search', 'filter', 'input')
+_SEARCH_TEXTS = ('search', 'filter', 'cari', 'pencarian', '')
+
+
+def _looks_like_search(has_input: bool, class_attr: str, text: str) -> bool:
+    """True if a dropdown option is really a search/filter input, not a value"""
+    if has_input:
+        return True
+    class_attr = class_attr.lower()
+    if any(hint in class_attr for hint in _SEARCH_CLASS_HINTS):
+        return True
+    return text.strip().lower() in _SEARCH_TEXTS
+
+
 class Executor:
 
+    __slots__ = ('page', 'assertion_engine', '_helpers_installed')
+
     def __init__(self, page: Page):
         self.page = page
+        self.assertion_engine: Optional[Any] = None
+        self._helpers_installed = False
+
+    async def _install_helpers(self):
+        """Register the shared JS helpers for this and every later document"""
+        try:
+            await self.page.add_init_script(_EXECUTOR_HELPERS_JS)
+            self._helpers_installed = True
+            await self.page.evaluate(_INSTALL_EXECUTOR_HELPERS_JS)
+        except Exception as e:
+            # Call sites fall back to inline checks while the helpers are missing
+            print(f"    ⚠️  Executor helpers not installed: {e}")
 
     async def execute(
         self,
@@ -48,36 +176,30 @@ class Executor:
         result = {"success": False, "action": action, "error": None}
 
         # Start capturing network calls for this action
-        if hasattr(self, 'assertion_engine') and self.assertion_engine:
+        if self.assertion_engine is not None:
             self.assertion_engine.start_network_capture()
 
         try:
+            if not self._helpers_installed:
+                await self._install_helpers()
             await locator.wait_for(state="visible", timeout=3000)
 
             if action == "click":
                 # Check if button is disabled
-                is_disabled = await locator.evaluate("""
-                    el => el.disabled || 
-                          el.getAttribute('aria-disabled') === 'true' ||
-                          el.classList.contains('mat-mdc-button-disabled')
-                """)
+                is_disabled = await locator.evaluate(_IS_DISABLED_JS)
 
                 if is_disabled:
-                    SUBMIT_KEYWORDS = ["simpan","save","submit","tambah","perbarui","update","cari","search"]
-                    is_submit_type = any(kw in target_name.lower() for kw in SUBMIT_KEYWORDS)
+                    is_submit_type = _SUBMIT_RE.search(target_name) is not None
 
                     if is_submit_type:
                         print(f"    ⏳ Submit button disabled, waiting up to 3s to enable...")
-                        for i in range(6):
-                            await asyncio.sleep(0.5)
-                            is_disabled = await locator.evaluate("""
-                                el => el.disabled || 
-                                    el.getAttribute('aria-disabled') === 'true' ||
-                                    el.classList.contains('mat-mdc-button-disabled')
-                            """)
-                            if not is_disabled:
-                                print(f"    ✓ Button enabled after {(i+1)*0.5}s")
-                                break
+                        try:
+                            handle = await locator.element_handle(timeout=1000)
+                            await self.page.wait_for_function(_IS_ENABLED_JS, arg=handle, timeout=3000)
+                            is_disabled = False
+                            print(f"    ✓ Button enabled")
+                        except Exception:
+                            pass
 
                     if is_disabled:
                         result["error"] = "Button remained disabled"
@@ -89,12 +211,21 @@ class Executor:
                 print(f"    ✓ Clicked")
 
             elif action == "fill":
-                await locator.fill(value or "TestValue", timeout=5000)
-                print(f"    ✓ Filled: {value}")
-                await asyncio.sleep(1)
+                fill_value = value or "TestValue"
+                # Re-fills on retry/replay are common; skip the clear-and-type if
+                # the field already holds the value
+                try:
+                    current_value = await locator.input_value(timeout=500)
+                except Exception:
+                    current_value = None
+                if current_value == fill_value:
+                    print(f"    ✓ Already filled: {value}")
+                else:
+                    await locator.fill(fill_value, timeout=5000)
+                    print(f"    ✓ Filled: {value}")
 
             elif action == "select":
-                tag = await locator.evaluate("el => el.tagName.toLowerCase()")
+                tag = await locator.evaluate("el => el.localName")
                 if tag == 'select':
                     await locator.select_option(label=value or "", timeout=5000)
                     print(f"    ✓ Selected (native): {value}")
@@ -109,9 +240,19 @@ class Executor:
                 await locator.check(timeout=5000)
                 print(f"    ✓ Checked")
 
-            await asyncio.sleep(1.5)
+            # Settle instead of a fixed pad: a navigation on the new document's
+            # load signal, an in-page (SPA) update on the DOM going quiet. Both
+            # are capped so a busy page cannot stall the step
+            try:
+                await self.page.wait_for_load_state("domcontentloaded", timeout=1500)
+            except Exception:
+                pass  # Still loading after the cap; the next observe waits on it
+            try:
+                await self.page.evaluate(_WAIT_FOR_QUIET_JS, [150, 1500])
+            except Exception:
+                pass  # Context torn down by a navigation; nothing left to settle
             result["success"] = True
-            if hasattr(self, 'assertion_engine') and self.assertion_engine:
+            if self.assertion_engine is not None:
                 self.assertion_engine.stop_network_capture()
 
         except Exception as e:
@@ -129,174 +270,97 @@ class Executor:
         await trigger.click(timeout=5000)
         print(f"    ✓ Opened custom dropdown")
         
-        # Wait for dropdown options to render
-        await asyncio.sleep(1.5)
+        # Wait for dropdown options to render while capturing formcontrolname;
+        # the two are independent so they share one round-trip window
+        _, formcontrolname = await asyncio.gather(
+            self.page.evaluate(_WAIT_FOR_OVERLAY_JS, [_OPTION_UNION_SELECTOR, 1500]),
+            trigger.get_attribute('formcontrolname'),
+            return_exceptions=True,
+        )
+        if not isinstance(formcontrolname, str):
+            formcontrolname = ""
+
+        all_options: List[str] = []
+        option_container_selectors = _OPTION_CONTAINER_SELECTORS
 
-        # Capture formcontrolname
-        formcontrolname = ""
+        # Read text/class/input-presence of every candidate option in one evaluate
+        # instead of several IPC calls per option
         try:
-            formcontrolname = await trigger.get_attribute('formcontrolname') or ""
+            option_reads = await self.page.locator(_OPTION_UNION_SELECTOR).evaluate_all(
+                _READ_OPTIONS_JS, option_container_selectors
+            )
         except Exception:
-            pass
+            option_reads = []
 
-        all_options: List[str] = []
-        option_container_selectors = [
-            # Angular Material (most specific first)
-            '.mat-mdc-option',
-            'mat-option',
-            # ARIA roles
-            '[role="option"]',
-            # PrimeNG
-            '.p-dropdown-item',
-            '.p-multiselect-item',
-            # Ant Design
-            '.ant-select-item-option',
-            # ng-select
-            '.ng-option',
-            # Vue Select
-            '.vs__dropdown-option',
-            # React Select
-            '.react-select__option',
-            # Generic overlay containers
-            '.cdk-overlay-container mat-option',
-            '.cdk-overlay-container [role="option"]',
-            '.cdk-overlay-pane mat-option',
-            '.dropdown-item',
-            # Last resort - any visible li in overlay
-            '.cdk-overlay-container li',
+        for sel, opts in zip(option_container_selectors, option_reads):
+            for i, o in enumerate(opts):
+                if _looks_like_search(o['hasInput'], o['classes'], o['text']):
+                    print(f"    ⏭️  Skipping search input at index {i}")
+                    continue
+                if o['text']:
+                    all_options.append(o['text'])
+            if all_options:
+                print(f"    📋 Available options: {all_options}")
+                break
+
+        # (selector, index, text) of every visible real option, in selector
+        # priority order; hidden ones would only stall the click
+        real_options = [
+            (sel, i, o['text'])
+            for sel, opts in zip(option_container_selectors, option_reads)
+            for i, o in enumerate(opts)
+            if o['visible'] and not _looks_like_search(o['hasInput'], o['classes'], o['text'])
         ]
-        
-        # NEW: Helper function to check if an option is a search input
-        async def is_search_input(opt_locator) -> bool:
-            """Check if this option is actually a search input field"""
-            try:
-                # Check if it contains an input element
-                has_input = await opt_locator.locator('input').count() > 0
-                if has_input:
-                    return True
-                
-                # Check if it has search-related classes
-                class_attr = await opt_locator.get_attribute('class') or ""
-                search_indicators = ['search', 'filter', 'input']
-                if any(indicator in class_attr.lower() for indicator in search_indicators):
-                    return True
-                
-                # Check if the text is "Search" or similar
-                text = (await opt_locator.inner_text()).strip().lower()
-                if text in ['search', 'filter', 'cari', 'pencarian', '']:
-                    return True
-                    
-                return False
-            except Exception:
-                return False
-        
-        for sel in option_container_selectors:
-            try:
-                opts = self.page.locator(sel)
-                count = await opts.count()
-                if count > 0:
-                    for i in range(count):
-                        try:
-                            opt = opts.nth(i)
-                            
-                            # NEW: Skip if this is a search input
-                            if await is_search_input(opt):
-                                print(f"    ⏭️  Skipping search input at index {i}")
-                                continue
-                            
-                            text = (await opt.inner_text()).strip()
-                            if text:
-                                all_options.append(text)
-                        except Exception:
-                            pass
-                    if all_options:
-                        print(f"    📋 Available options: {all_options}")
-                        break
-            except Exception:
-                continue
 
         clicked = False
         selected_value = None
 
-        # Try to find exact match for the requested value
-        specific_selectors = [
-            f'mat-option:has-text("{value}")',
-            f'.p-dropdown-item:has-text("{value}")',
-            f'.p-multiselect-item:has-text("{value}")',
-            f'.ant-select-item-option:has-text("{value}")',
-            f'.ng-option:has-text("{value}")',
-            f'.vs__dropdown-option:has-text("{value}")',
-            f'.react-select__option:has-text("{value}")',
-            f'[role="option"]:has-text("{value}")',
-            f'[role="listbox"] li:has-text("{value}")',
-            f'.cdk-overlay-container li:has-text("{value}")',
-            f'.dropdown-item:has-text("{value}")',
-        ]
-        
-        for sel in specific_selectors:
-            try:
-                opt = self.page.locator(sel).first
-                if await opt.count() > 0:
-                    # NEW: Check if this is a search input before clicking
-                    if await is_search_input(opt):
-                        continue
-                        
-                    await opt.wait_for(state="visible", timeout=2000)
-                    await opt.click(timeout=3000)
-                    selected_value = value
-                    print(f"    ✓ Selected '{value}'")
-                    clicked = True
-                    break
-            except Exception:
-                continue
+        # Try to find exact match for the requested value: one union locator,
+        # ranked by selector priority in the same browser pass
+        matches = self.page.locator(f'{_VALUE_OPTION_UNION}:has-text({_css_string(value)})')
+        try:
+            ranked = await matches.evaluate_all(_RANK_OPTIONS_JS, list(_VALUE_OPTION_SELECTORS))
+        except Exception:
+            ranked = []
 
-        if not clicked:
+        candidates = sorted(
+            (o['rank'], i) for i, o in enumerate(ranked)
+            if o['visible'] and not _looks_like_search(o['hasInput'], o['classes'], o['text'])
+        )
+        for _, i in candidates:
             try:
-                opt = self.page.get_by_role("option", name=value, exact=False)
-                if await opt.count() > 0:
-                    # NEW: Check if this is a search input before clicking
-                    if not await is_search_input(opt.first):
-                        await opt.first.click(timeout=3000)
-                        selected_value = value
-                        print(f"    ✓ Selected '{value}' via role=option")
-                        clicked = True
+                await matches.nth(i).click(timeout=3000)
+                selected_value = value
+                print(f"    ✓ Selected '{value}'")
+                clicked = True
+                break
             except Exception:
-                pass
+                continue
 
-        # NEW: If still not clicked, select first REAL option (skip search inputs)
+        # Remaining fallbacks come from the batched read, no extra DOM scans:
+        # a case-insensitive partial match first, else the first real option.
+        # Only the final click goes back to the browser
         if not clicked:
-            for sel in option_container_selectors:
+            needle = value.lower()
+            # Lower-case each option once; the flag drives both the ordering
+            # and the success message
+            ordered = sorted(
+                ((needle in text.lower(), sel, i, text) for sel, i, text in real_options),
+                key=lambda r: not r[0],
+            )
+            for is_match, sel, i, text in ordered:
                 try:
-                    opts = self.page.locator(sel)
-                    count = await opts.count()
-                    
-                    # Iterate through options to find first non-search option
-                    for i in range(count):
-                        opt = opts.nth(i)
-                        
-                        # Skip search inputs
-                        if await is_search_input(opt):
-                            print(f"    ⏭️  Skipping search input at index {i}")
-                            continue
-                        
-                        # Found a real option - select it
-                        await opt.wait_for(state="visible", timeout=2000)
-                        selected_value = (await opt.inner_text()).strip()
-                        
-                        # Final check - if text is empty or still looks like search, skip
-                        if not selected_value or selected_value.lower() in ['search', 'cari', 'filter']:
-                            continue
-                        
-                        await opt.click(timeout=3000)
-                        print(f"    ✓ No exact match — selected first real option (index {i}): '{selected_value}'")
-                        clicked = True
-                        break
-                    
-                    if clicked:
-                        break
-                        
+                    await self.page.locator(sel).nth(i).click(timeout=3000)
                 except Exception:
                     continue
+                if is_match:
+                    selected_value = value
+                    print(f"    ✓ Selected '{value}' via partial match")
+                else:
+                    selected_value = text
+                    print(f"    ✓ No exact match — selected first real option (index {i}): '{selected_value}'")
+                clicked = True
+                break
 
         if not clicked:
             try:
@@ -305,9 +369,19 @@ class Executor:
                 pass
             raise Exception("Could not select any option from custom dropdown.")
         
-        # Click outside to close dropdown
-        await self.page.mouse.click(10, 10)
-        await asyncio.sleep(0.5)
+        # Most libraries close the overlay on selection; only click outside
+        # when it is still showing
+        overlay = self.page.locator(_VISIBLE_OPTION_SELECTOR).first
+        try:
+            still_open = await overlay.count() > 0
+        except Exception:
+            still_open = True
+        if still_open:
+            await self.page.mouse.click(10, 10)
+            try:
+                await overlay.wait_for(state="hidden", timeout=500)
+            except Exception:
+                pass
         
         return {
             "selected": selected_value,
@@ -1,97 +1,142 @@
 
-import asyncio
-import json
-import base64
-import hashlib
 from pathlib import Path
+from collections import OrderedDict
 from datetime import datetime
-from typing import Optional, Dict, List, Any, Tuple, Set
-from urllib.parse import urlparse, urljoin
-from dataclasses import dataclass, field
-from enum import Enum
+from typing import Optional, Dict, List, Tuple, Set, Iterator
+from dataclasses import dataclass
 
-from playwright.async_api import async_playwright, Page, Locator, FrameLocator
-from openai import OpenAI
+import orjson
 
 
-class ContextType(Enum):
-    PAGE = "page"
-    MODAL = "modal"
-    FORM = "form"
-    DROPDOWN = "dropdown"
-    TABLE = "table"
-    CONFIRMATION = "confirmation"
+# (context, element kind, distinguishing value), e.g. ('page', 'input', 'email')
+ElementId = Tuple[str, str, str]
 
+# Actions that count towards "already tested" when no action type is given
+_TRACKED_ACTIONS = frozenset(('click', 'fill', 'select', 'check'))
+_NO_ACTIONS: frozenset = frozenset()
 
-@dataclass
-class ContextFrame:
-    context_type: ContextType
-    description: str
+# Most-recently-tested identifiers kept in memory; older ones fall out and may
+# be re-tested, which is cheaper than unbounded growth over long sessions
+TESTED_ELEMENTS_MAX = 50_000
+
+
+@dataclass(slots=True)
+class TestedAction:
+    element: ElementId
+    action: str
     timestamp: str
-    url: str
-    dom_hash: str
-    overlay_selector: Optional[str] = None
+
+
 class GlobalMemory:
     """
     Global memory that persists across ALL contexts.
     Remembers every element tested in the entire session.
     """
-    def __init__(self):
-        self.tested_elements: Set[str] = set()
-        self.tested_actions: List[Dict] = []
-
-    def mark_tested(self, element_identifier: str, action: str):
-        signature = f"{action}:{element_identifier}"
-        self.tested_elements.add(signature)
-        self.tested_actions.append({
-            "element": element_identifier,
-            "action": action,
-            "timestamp": datetime.now().isoformat()
-        })
-
-    def is_tested(self, element_identifier: str, action: str) -> bool:
-        signature = f"{action}:{element_identifier}"
-        return signature in self.tested_elements
+    __slots__ = ('tested_by_id', 'log_path', '_log', '_identifier_memo')
+
+    def __init__(self, log_path: Optional[Path] = None):
+        # identifier -> actions tested on it; one lookup answers any action
+        self.tested_by_id: "OrderedDict[ElementId, Set[str]]" = OrderedDict()
+        # Action history goes straight to an append-only NDJSON file so it
+        # costs no memory however long the session runs
+        self.log_path = Path(log_path) if log_path else None
+        self._log = open(self.log_path, 'ab', buffering=0) if self.log_path else None
+        # id(element) -> (element, identifier) for the current snapshot; the
+        # element is kept so a recycled id() can never return a stale key
+        self._identifier_memo: Dict[int, Tuple[Dict, ElementId]] = {}
+
+    def _record(self, element_identifier: ElementId, action: str):
+        """Add action to the identifier's set, refreshing its LRU position"""
+        tested_by_id = self.tested_by_id
+        actions = tested_by_id.get(element_identifier)
+        if actions is None:
+            tested_by_id[element_identifier] = {action}
+            if len(tested_by_id) > TESTED_ELEMENTS_MAX:
+                tested_by_id.popitem(last=False)
+        else:
+            actions.add(action)
+            tested_by_id.move_to_end(element_identifier)
+
+    def mark_tested(self, element_identifier: ElementId, action: str):
+        self._record(element_identifier, action)
+        if self._log is not None:
+            entry = TestedAction(element_identifier, action, datetime.now().isoformat())
+            self._log.write(orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE))
+
+    def mark_tested_batch(self, entries: List[Tuple[ElementId, str]]):
+        """mark_tested for many (identifier, action) pairs with one timestamp and one write"""
+        for element_identifier, action in entries:
+            self._record(element_identifier, action)
+        if self._log is not None and entries:
+            now = datetime.now().isoformat()
+            self._log.write(b"".join(
+                orjson.dumps(TestedAction(element_identifier, action, now), option=orjson.OPT_APPEND_NEWLINE)
+                for element_identifier, action in entries
+            ))
+
+    def iter_actions(self) -> Iterator[TestedAction]:
+        """Replay the tested-action history from the NDJSON log"""
+        if self.log_path is None or not self.log_path.exists():
+            return
+        with open(self.log_path, 'rb') as f:
+            for line in f:
+                if line.strip():
+                    entry = orjson.loads(line)
+                    yield TestedAction(tuple(entry['element']), entry['action'], entry['timestamp'])
+
+    def close(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def is_tested(self, element_identifier: ElementId, action: str) -> bool:
+        return action in self.tested_by_id.get(element_identifier, _NO_ACTIONS)
 
     def get_untested(self, elements: List[Dict], action_type: str = None) -> List[Dict]:
+        # A new element list means the previous snapshot's entries are dead
+        self._identifier_memo.clear()
         untested = []
+        tested_by_id = self.tested_by_id
         for elem in elements:
-            identifier = self._get_identifier(elem)
+            actions = tested_by_id.get(self._get_identifier(elem), _NO_ACTIONS)
             if action_type:
-                if not self.is_tested(identifier, action_type):
-                    untested.append(elem)
-            else:
-                any_tested = any(
-                    self.is_tested(identifier, a)
-                    for a in ['click', 'fill', 'select', 'check']
-                )
-                if not any_tested:
+                if action_type not in actions:
                     untested.append(elem)
+            elif actions.isdisjoint(_TRACKED_ACTIONS):
+                untested.append(elem)
         return untested
 
-    def _get_identifier(self, element: Dict) -> str:
+    def _get_identifier(self, element: Dict) -> ElementId:
         """
         CRITICAL: This method defines how we identify elements.
         Must be used consistently everywhere in the codebase.
         """
-        is_in_overlay = element.get('in_overlay', False)
-        context_prefix = 'overlay:' if is_in_overlay else 'page:'
+        hit = self._identifier_memo.get(id(element))
+        if hit is not None and hit[0] is element:
+            return hit[1]
+        identifier = self._compute_identifier(element)
+        self._identifier_memo[id(element)] = (element, identifier)
+        return identifier
+
+    @staticmethod
+    def _compute_identifier(element: Dict) -> ElementId:
+        context_prefix = 'overlay' if element.get('in_overlay', False) else 'page'
 
         formcontrol = element.get('formcontrolname', '')
         if formcontrol:
-            return f"{context_prefix}{element.get('tag', 'input')}:{formcontrol}"
+            return (context_prefix, element.get('tag', 'input'), formcontrol)
 
         name_attr = element.get('name', '')
         if name_attr:
-            return f"{context_prefix}{element.get('element_type', 'element')}:{name_attr}"
+            return (context_prefix, element.get('element_type', 'element'), name_attr)
 
         text = element.get('text', '').strip()
         elem_type = element.get('element_type', element.get('tag', ''))
         if text:
-            return f"{context_prefix}{elem_type}:{text[:50]}"
+            return (context_prefix, elem_type, text[:50])
 
         id_attr = element.get('id', '')
         if id_attr:
-            return f"{context_prefix}{elem_type}:#{id_attr}"
+            return (context_prefix, elem_type, '#' + id_attr)
 
-        return f"{context_prefix}{elem_type}:unknown"
+        return (context_prefix, elem_type, 'unknown')
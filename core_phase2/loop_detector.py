@@ -1,54 +1,31 @@
 
-import asyncio
-import json
-import base64
-import hashlib
-from pathlib import Path
-from datetime import datetime
-from typing import Optional, Dict, List, Any, Tuple, Set
-from urllib.parse import urlparse, urljoin
-from dataclasses import dataclass, field
-from enum import Enum
+from collections import deque
+from typing import Tuple
 
-from playwright.async_api import async_playwright, Page, Locator, FrameLocator
-from openai import OpenAI
-
-
-class ContextType(Enum):
-    PAGE = "page"
-    MODAL = "modal"
-    FORM = "form"
-    DROPDOWN = "dropdown"
-    TABLE = "table"
-    CONFIRMATION = "confirmation"
-
-
-@dataclass
-class ContextFrame:
-    context_type: ContextType
-    description: str
-    timestamp: str
-    url: str
-    dom_hash: str
-    overlay_selector: Optional[str] = None
 
 class LoopDetector:
     def __init__(self):
-        self.recent_actions: List[str] = []
         self.window_size = 5
         self.threshold = 3
+        # Bounded window: appends evict the oldest entry in O(1)
+        self.recent_actions: deque = deque(maxlen=self.window_size)
 
     def record(self, action: str, target: str):
         signature = f"{action}:{target}"
         self.recent_actions.append(signature)
-        if len(self.recent_actions) > self.window_size:
-            self.recent_actions.pop(0)
 
     def is_looping(self) -> Tuple[bool, str]:
         if len(self.recent_actions) < self.threshold:
             return False, ""
-        last_action = self.recent_actions[-1]
-        count = self.recent_actions[-self.threshold:].count(last_action)
+        # Walk back from the newest entry and stop at the first different one;
+        # a full run of `threshold` identical entries is a loop
+        it = reversed(self.recent_actions)
+        last_action = next(it)
+        count = 1
+        for a in it:
+            if count >= self.threshold or a != last_action:
+                break
+            count += 1
         if count >= self.threshold:
             return True, f"Same action {count} times: {last_action}"
         return False, ""
\ No newline at end of file
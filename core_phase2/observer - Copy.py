@@ -6,30 +6,12 @@ from pathlib import Path
 from datetime import datetime
 from typing import Optional, Dict, List, Any, Tuple, Set
 from urllib.parse import urlparse, urljoin
-from dataclasses import dataclass, field
-from enum import Enum
 
 from playwright.async_api import async_playwright, Page, Locator, FrameLocator
 from openai import OpenAI
 
+from core_phase2.types import ContextType
 
-class ContextType(Enum):
-    PAGE = "page"
-    MODAL = "modal"
-    FORM = "form"
-    DROPDOWN = "dropdown"
-    TABLE = "table"
-    CONFIRMATION = "confirmation"
-
-
-@dataclass
-class ContextFrame:
-    context_type: ContextType
-    description: str
-    timestamp: str
-    url: str
-    dom_hash: str
-    overlay_selector: Optional[str] = None
 
 class Observer:
 
@@ -2,34 +2,562 @@ import asyncio
 import json
 import base64
 import hashlib
+import re
+import weakref
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, Dict, List, Any, Tuple, Set
 from urllib.parse import urlparse, urljoin
-from dataclasses import dataclass, field
-from enum import Enum
 
+import orjson
 from playwright.async_api import async_playwright, Page, Locator, FrameLocator
 from openai import OpenAI
 
+from core_phase2.types import ContextType
+
+
+# Registered once per page (init script + current document) so each observation
+# ships a one-line call instead of re-sending and re-parsing the whole collector
+_GET_ELEMENTS_JS = r"""
+window.__autotestGetElements = (overlaySelectors) => {
+    const interactive = [];
+
+    const strictSelectors = {
+        buttons:   'button',
+        links:     'a[href]',
+        inputs:    'input:not([type="hidden"])',
+        selects:   'select',
+        textareas: 'textarea',
+    };
+
+    // ── Overlay detection ────────────────────────────────────────────
+    let activeOverlay = null;
+    let activeOverlaySelector = null;
+    let maxZIndex = -1;
+
+    for (const sel of overlaySelectors) {
+        document.querySelectorAll(sel).forEach(overlay => {
+            const rect = overlay.getBoundingClientRect();
+            if (rect.width === 0 || rect.height === 0) return;
+
+            const style = window.getComputedStyle(overlay);
+            if (style.display === 'none' || style.visibility === 'hidden') return;
+
+            const zIndex = parseInt(style.zIndex) || 0;
+            if (zIndex > maxZIndex || !activeOverlay) {
+                maxZIndex = zIndex;
+                activeOverlay = overlay;
+                activeOverlaySelector = sel;
+            }
+        });
+    }
+
+    // One walk of the overlay subtree; membership below is then a Set lookup
+    // instead of an ancestor climb per element (root included, like contains)
+    const overlaySet = activeOverlay ? new Set(activeOverlay.querySelectorAll('*')) : null;
+    if (overlaySet) overlaySet.add(activeOverlay);
+
+    // ── Helper: display/visibility/opacity check ─────────────────────
+    // checkVisibility rules out display/visibility natively. Opacity is the
+    // element's own only: checkVisibility's opacity options also look at
+    // ancestors, which would drop every control in a dialog still fading in.
+    const hasCheckVisibility = typeof Element.prototype.checkVisibility === 'function';
+    const visibilityOptions = { checkVisibilityCSS: true, visibilityProperty: true };
+    function isRendered(el) {
+        if (hasCheckVisibility) {
+            return el.checkVisibility(visibilityOptions) &&
+                window.getComputedStyle(el).opacity !== '0';
+        }
+        const style = window.getComputedStyle(el);
+        return !(style.display === 'none' || style.visibility === 'hidden' || style.opacity === '0');
+    }
+
+    // ── Helper: is element truly interactive? ────────────────────────
+    function isTrulyInteractive(el) {
+        const rect = el.getBoundingClientRect();
+        if (rect.width === 0 || rect.height === 0) return false;
+
+        if (!isRendered(el)) return false;
+
+        // Don't filter out disabled elements - we'll mark them as disabled instead
+        // This allows us to see submit buttons that become enabled after form fills
+        
+        const tag = el.tagName.toLowerCase();
+        const type = el.type || '';
+        if ((tag === 'input' || tag === 'textarea') &&
+            type !== 'checkbox' && type !== 'radio' &&
+            el.readOnly) return false;
+
+        return true;
+    }
+    
+    // ── Helper: label[for=id] lookup ─────────────────────────────────
+    // Indexed on first use with one scan, instead of a document-wide
+    // querySelector per unlabeled field; first label wins, as before
+    let labelsByFor = null;
+    function labelFor(id) {
+        if (!labelsByFor) {
+            labelsByFor = new Map();
+            document.querySelectorAll('label[for]').forEach(l => {
+                const f = l.getAttribute('for');
+                if (!labelsByFor.has(f)) labelsByFor.set(f, l);
+            });
+        }
+        return labelsByFor.get(id);
+    }
+
+    // ── Helper: first five class tokens ──────────────────────────────
+    // Read from the attribute string rather than materialising an array from
+    // the live DOMTokenList and slicing it for every element
+    function classTokens(el) {
+        const cls = (el.getAttribute('class') || '').trim();
+        return cls ? cls.split(/\s+/, 5) : [];
+    }
+
+    // ── Helper: is element disabled? ─────────────────────────────────
+    function isDisabled(el) {
+        if (el.disabled) return true;
+        if (el.getAttribute('aria-disabled') === 'true') return true;
+        if (el.hasAttribute('disabledinteractive') && el.classList.contains('mat-mdc-button-disabled-interactive')) return true;
+        return false;
+    }
+
+    const seen = new Set();
+
+    // ── One DOM walk for every strict kind ────────────────────────────
+    // Bucketed by tag so the collectors below still run in the original
+    // buttons → links → inputs → selects → textareas order
+    const byTag = { button: [], a: [], input: [], select: [], textarea: [] };
+    document.querySelectorAll(Object.values(strictSelectors).join(', ')).forEach(el => {
+        const bucket = byTag[el.tagName.toLowerCase()];
+        if (bucket) bucket.push(el);
+    });
+
+    // Same idea for selector lists: one walk, then bucket each element
+    // under the first selector it matches (invalid selectors dropped)
+    function collectBySelector(selectors) {
+        const valid = selectors.filter(sel => {
+            try { document.createDocumentFragment().querySelector(sel); return true; }
+            catch (e) { return false; }
+        });
+        const buckets = valid.map(() => []);
+        if (!valid.length) return buckets;
+        document.querySelectorAll(valid.join(', ')).forEach(el => {
+            const i = valid.findIndex(sel => el.matches(sel));
+            if (i >= 0) buckets[i].push(el);
+        });
+        return buckets;
+    }
+
+    // ── Collect buttons ───────────────────────────────────────────────
+    byTag.button.forEach(el => {
+        if (!isTrulyInteractive(el)) return;
+
+        const rect = el.getBoundingClientRect();
+        const isInOverlay = overlaySet ? overlaySet.has(el) : false;
+        const isBlocked   = activeOverlay && !isInOverlay;
+        const disabled    = isDisabled(el);
+
+        const _clone = el.cloneNode(true);
+        _clone.querySelectorAll('mat-icon, .material-icons, svg, i.fa').forEach(function(n) { n.remove(); });
+        const text = (
+            el.getAttribute('aria-label') ||
+            el.getAttribute('title') ||
+            _clone.innerText ||
+            _clone.textContent || ''
+        ).trim().replace(/\s+/g, ' ').slice(0, 150);
+
+        if (!text) return;
+
+        const contextPrefix = isInOverlay ? 'overlay:' : 'page:';
+        const key = `${contextPrefix}button:${text}:${el.id}`;
+        if (seen.has(key)) return;
+        seen.add(key);
+
+        interactive.push({
+            tag: 'button', type: el.type || 'button',
+            role: el.getAttribute('role') || 'button',
+            text, id: el.id || '', name: el.getAttribute('name') || '',
+            classes: classTokens(el),
+            href: '', required: false, enabled: !disabled,
+            blocked: isBlocked, in_overlay: isInOverlay,
+            x: Math.round(rect.x), y: Math.round(rect.y),
+            element_type: 'button'
+        });
+    });
+
+    // ── Collect links ─────────────────────────────────────────────────
+    byTag.a.forEach(el => {
+        if (!isTrulyInteractive(el)) return;
+
+        const rect = el.getBoundingClientRect();
+        const isInOverlay = overlaySet ? overlaySet.has(el) : false;
+        const isBlocked   = activeOverlay && !isInOverlay;
+
+        const text = (
+            el.innerText || el.textContent ||
+            el.getAttribute('aria-label') || ''
+        ).trim().slice(0, 150);
+
+        const href = el.getAttribute('href') || '';
+        const contextPrefix = isInOverlay ? 'overlay:' : 'page:';
+        const key  = `${contextPrefix}link:${text}:${href}`;
+        if (seen.has(key)) return;
+        seen.add(key);
+
+        interactive.push({
+            tag: 'a', type: '', role: 'link',
+            text, id: el.id || '', name: '',
+            classes: classTokens(el),
+            href, required: false, enabled: true,
+            blocked: isBlocked, in_overlay: isInOverlay,
+            x: Math.round(rect.x), y: Math.round(rect.y),
+            element_type: 'link'
+        });
+    });
+
+    // ── Collect inputs ────────────────────────────────────────────────
+    byTag.input.forEach(el => {
+        if (!isTrulyInteractive(el)) return;
+
+        const rect = el.getBoundingClientRect();
+        const isInOverlay = overlaySet ? overlaySet.has(el) : false;
+        const isBlocked   = activeOverlay && !isInOverlay;
+
+        
+
+        const placeholder      = el.placeholder || '';
+        const ariaLabel        = el.getAttribute('aria-label') || '';
+        const nameAttr         = el.getAttribute('name') || '';
+        const formControlName  = el.getAttribute('formcontrolname') || '';
+        const id               = el.id || '';
+
+        let label = placeholder || ariaLabel || formControlName || nameAttr;
+        if (!label && id) {
+            const labelEl = labelFor(id);
+            if (labelEl) label = labelEl.innerText.trim();
+        }
+        if (!label) label = `${el.type || 'text'} input`;
+
+        const contextPrefix = isInOverlay ? 'overlay:' : 'page:';
+        const key = `${contextPrefix}input:${el.type}:${label}:${id}`;
+        if (seen.has(key)) return;
+        seen.add(key);
+
+        interactive.push({
+            tag: 'input', type: el.type || 'text', role: 'textbox',
+            text: label, id, name: nameAttr,
+            classes: classTokens(el),
+            href: '', required: el.hasAttribute('required'),
+            enabled: true, blocked: isBlocked, in_overlay: isInOverlay,
+            x: Math.round(rect.x), y: Math.round(rect.y),
+            element_type: 'input',
+            placeholder, formcontrolname: formControlName
+        });
+    });
+
+    // ── Collect selects ───────────────────────────────────────────────
+    byTag.select.forEach(el => {
+        if (!isTrulyInteractive(el)) return;
+
+        const rect = el.getBoundingClientRect();
+        const isInOverlay = overlaySet ? overlaySet.has(el) : false;
+        const isBlocked   = activeOverlay && !isInOverlay;
+
+        const label = el.getAttribute('aria-label') || el.getAttribute('name') || 'Select';
+        const formControlName = el.getAttribute('formcontrolname') || '';
+        const contextPrefix = isInOverlay ? 'overlay:' : 'page:';
+        const key   = `${contextPrefix}select:${label}:${el.id}`;
+        if (seen.has(key)) return;
+        seen.add(key);
+
+        interactive.push({
+            tag: 'select', type: '', role: 'combobox',
+            text: label, id: el.id || '', name: el.getAttribute('name') || '',
+            classes: classTokens(el),
+            href: '', required: el.hasAttribute('required'),
+            enabled: true, blocked: isBlocked, in_overlay: isInOverlay,
+            x: Math.round(rect.x), y: Math.round(rect.y),
+            element_type: 'select',
+            formcontrolname: formControlName
+        });
+    });
+
+    // ── Collect textareas ─────────────────────────────────────────────
+    byTag.textarea.forEach(el => {
+        if (!isTrulyInteractive(el)) return;
+
+        const rect = el.getBoundingClientRect();
+        const isInOverlay = overlaySet ? overlaySet.has(el) : false;
+        const isBlocked   = activeOverlay && !isInOverlay;
+
+        const placeholder     = el.placeholder || '';
+        const ariaLabel       = el.getAttribute('aria-label') || '';
+        const nameAttr        = el.getAttribute('name') || '';
+        const formControlName = el.getAttribute('formcontrolname') || '';
+        const id              = el.id || '';
+
+        let label = placeholder || ariaLabel || formControlName || nameAttr;
+        if (!label && id) {
+            const labelEl = labelFor(id);
+            if (labelEl) label = labelEl.innerText.trim();
+        }
+        if (!label) label = 'textarea';
+
+        const contextPrefix = isInOverlay ? 'overlay:' : 'page:';
+        const key = `${contextPrefix}textarea:${label}:${id}`;
+        if (seen.has(key)) return;
+        seen.add(key);
+
+        interactive.push({
+            tag: 'textarea', type: '', role: 'textbox',
+            text: label, id, name: nameAttr,
+            classes: classTokens(el),
+            href: '', required: el.hasAttribute('required'),
+            enabled: true, blocked: isBlocked, in_overlay: isInOverlay,
+            x: Math.round(rect.x), y: Math.round(rect.y),
+            element_type: 'textarea',
+            placeholder, formcontrolname: formControlName
+        });
+    });
+
+    // ── Collect ARIA interactive elements (tabs, custom buttons) ──────
+    const ariaSelectors = [
+    '[role="tab"]',
+    '[role="button"]:not(button)',
+    '[role="menuitem"]:not(button):not(a)',
+    '[tabindex="0"]:not(button):not(a):not(input):not(select):not(textarea)',
+];
+    collectBySelector(ariaSelectors).forEach(bucket => {
+        bucket.forEach(el => {
+            if (!isTrulyInteractive(el)) return;
+
+            const rect = el.getBoundingClientRect();
+            const isInOverlay = overlaySet ? overlaySet.has(el) : false;
+            const isBlocked   = activeOverlay && !isInOverlay;
+
+            const text = (
+                el.getAttribute('aria-label') ||
+                el.getAttribute('title') ||
+                el.innerText ||
+                el.textContent || ''
+            ).trim().replace(/\s+/g, ' ').slice(0, 150);
+
+            if (!text) return;
+
+            const contextPrefix = isInOverlay ? 'overlay:' : 'page:';
+            const key = `${contextPrefix}aria:${text}:${el.id}`;
+            if (seen.has(key)) return;
+            seen.add(key);
+
+            interactive.push({
+                tag: el.tagName.toLowerCase(),
+                type: el.getAttribute('role') || 'button',
+                role: el.getAttribute('role') || 'button',
+                text, id: el.id || '', name: el.getAttribute('name') || '',
+                classes: classTokens(el),
+                href: el.getAttribute('href') || '',
+                required: false, enabled: !isDisabled(el),
+                blocked: isBlocked, in_overlay: isInOverlay,
+                x: Math.round(rect.x), y: Math.round(rect.y),
+                element_type: el.getAttribute('role') || 'button'
+            });
+        });
+    });
+
+    // ── Collect CUSTOM SELECT components ──────────────────────────────
+    const customSelectSelectors = [
+        '[role="combobox"]:not(input):not(select)',
+        '[role="listbox"]:not(select)',
+        'mat-select',
+        'p-dropdown .p-dropdown',
+        'p-multiselect .p-multiselect',
+        '.ant-select-selector',
+        'ng-select',
+        '.vs__dropdown-toggle',
+        '.react-select__control',
+        '.v-select__slot',
+    ];
+
+    function getCustomLabel(el) {
+        let label = el.getAttribute('aria-label') || '';
+        if (label) return label;
+
+        label = el.getAttribute('formcontrolname') || '';
+        if (label) return label;
+
+        const labelledBy = el.getAttribute('aria-labelledby') || '';
+        if (labelledBy) {
+            const lbl = document.getElementById(labelledBy);
+            if (lbl) return lbl.innerText.trim();
+        }
+
+        let node = el.parentElement;
+        for (let i = 0; i < 4 && node; i++) {
+            const lbl = node.querySelector('label');
+            if (lbl && lbl.innerText.trim()) return lbl.innerText.trim();
+            const matLabel = node.querySelector('mat-label');
+            if (matLabel && matLabel.innerText.trim()) return matLabel.innerText.trim();
+            node = node.parentElement;
+        }
+
+        const placeholder = el.querySelector(
+            '.mat-mdc-select-placeholder, .p-placeholder, ' +
+            '.ant-select-selection-placeholder, .vs__placeholder, ' +
+            '[class*="placeholder"]'
+        );
+        if (placeholder && placeholder.innerText.trim())
+            return placeholder.innerText.trim();
+
+        label = el.getAttribute('name') || '';
+        if (label) return label;
+
+        label = el.id || '';
+        if (label) return label;
+
+        return 'custom-select';
+    }
+
+    function isCustomSelectDisabled(el) {
+        if (el.getAttribute('aria-disabled') === 'true') return true;
+        if (el.hasAttribute('disabled')) return true;
+        if (el.classList.contains('mat-mdc-select-disabled')) return true;
+        if (el.classList.contains('mat-select-disabled')) return true;
+        if (el.classList.contains('p-disabled')) return true;
+        if (el.classList.contains('ant-select-disabled')) return true;
+        return false;
+    }
+
+    // Custom selects share `seen`: their keys ('<ctx>:formcontrol:', '<ctx>:customselect:',
+    // context-free 'fc:') never collide with the collectors' '<ctx>:<kind>:' keys
+    collectBySelector(customSelectSelectors).forEach(elements => {
+        elements.forEach(el => {
+            const rect = el.getBoundingClientRect();
+            if (rect.width === 0 || rect.height === 0) return;
+            if (!isRendered(el)) return;
+
+            if (isCustomSelectDisabled(el)) return;
+
+            const isInOverlay = overlaySet ? overlaySet.has(el) : false;
+            const isBlocked   = activeOverlay && !isInOverlay;
+
+            const label          = getCustomLabel(el);
+            const formcontrol    = el.getAttribute('formcontrolname') || '';
+            const id             = el.id || '';
+            const required       = el.hasAttribute('required') ||
+                                el.getAttribute('aria-required') === 'true';
+
+            const contextPrefix = isInOverlay ? 'overlay:' : 'page:';
+
+            // FIX: Prioritize formcontrolname for deduplication
+            // If element has formcontrolname, that's the primary key
+            let dedupKey;
+            if (formcontrol) {
+                dedupKey = `${contextPrefix}formcontrol:${formcontrol}`;
+                // Also track formcontrolname regardless of context
+                if (seen.has(`fc:${formcontrol}`)) return;
+                seen.add(`fc:${formcontrol}`);
+            } else {
+                dedupKey = `${contextPrefix}customselect:${id || label}`;
+            }
+            
+            if (seen.has(dedupKey)) return;
+            seen.add(dedupKey);
 
-class ContextType(Enum):
-    PAGE = "page"
-    MODAL = "modal"
-    FORM = "form"
-    DROPDOWN = "dropdown"
-    TABLE = "table"
-    CONFIRMATION = "confirmation"
-
+            // Skip if native <select> with same formcontrolname already collected
+            if (formcontrol && seen.has(`${contextPrefix}select::${formcontrol}`)) return;
+            
+            const nativeKey = `${contextPrefix}select::${label}:${id}`;
+            if (seen.has(nativeKey)) return;
+
+            interactive.push({
+                tag: el.tagName.toLowerCase(),
+                type: 'custom-select',
+                role: el.getAttribute('role') || 'combobox',
+                text: label,
+                id,
+                name: el.getAttribute('name') || '',
+                classes: classTokens(el),
+                href: '',
+                required,
+                enabled: true,
+                blocked: isBlocked,
+                in_overlay: isInOverlay,
+                x: Math.round(rect.x),
+                y: Math.round(rect.y),
+                element_type: 'custom-select',
+                placeholder: '',
+                formcontrolname: formcontrol
+            });
+        });
+    });
+
+    // ── Overlay type ──────────────────────────────────────────────────
+    let overlayType = null;
+    let widgetType = null;
+    if (activeOverlay) {
+        const isCalendar = activeOverlay.querySelector(
+            'mat-calendar, [class*="mat-calendar"], [class*="datepicker-calendar"]'
+        );
+        if (isCalendar) {
+            overlayType = 'widget';
+            widgetType  = 'calendar';
+        } else {
+
+            const txt = activeOverlay.innerText.toLowerCase();
+            if (/confirm|yakin|are you sure/.test(txt))
+                overlayType = 'confirmation';
+            else if (activeOverlay.querySelector(
+                'input, select, textarea, mat-select, ng-select, ' +
+                '[role="combobox"], [formcontrolname]'
+            ))
+                overlayType = 'form';
+            else
+                overlayType = 'info';
+        }
+
+        }
+
+    return {
+        has_overlay:       !!activeOverlay,
+        overlay_type:      overlayType,
+        widget_type:       widgetType,  
+        overlay_selector:  activeOverlaySelector,
+        elements:          interactive,
+        total_discovered:  interactive.length,
+        has_table:         !!document.querySelector('table, .table, [role="grid"]')
+    };
+};
+"""
+
+# Nudge lazy-loaded content in: bottom, give its fetches time to land, back to top
+_LAZY_LOAD_SCROLL_JS = """
+async () => {
+    window.scrollTo(0, document.body.scrollHeight);
+    await new Promise(r => setTimeout(r, 500));
+    window.scrollTo(0, 0);
+}
+"""
+
+# Returned as one JSON string: V8's stringify plus orjson beats Playwright
+# walking and re-boxing every field of the element list
+_CALL_GET_ELEMENTS_JS = (
+    "sels => window.__autotestGetElements ? JSON.stringify(window.__autotestGetElements(sels)) : null"
+)
+# Installs into a document that predates the init script and calls it in one go;
+# wrapped in a function so Playwright passes the selectors instead of calling
+# the bare assignment's result with no arguments
+_INSTALL_GET_ELEMENTS_JS = (
+    f"sels => {{ {_GET_ELEMENTS_JS.strip()} "
+    "return JSON.stringify(window.__autotestGetElements(sels)); }"
+)
+
+# Submit-like button text that, alongside inputs, marks a page as a form
+_SUBMIT_RE = re.compile(r'submit|save|simpan|tambah|perbarui|update', re.IGNORECASE)
+
+# Pages that already carry _GET_ELEMENTS_JS as an init script
+_pages_with_collector: "weakref.WeakSet[Page]" = weakref.WeakSet()
 
-@dataclass
-class ContextFrame:
-    context_type: ContextType
-    description: str
-    timestamp: str
-    url: str
-    dom_hash: str
-    overlay_selector: Optional[str] = None
 
 class Observer:
 
@@ -44,475 +572,43 @@ class Observer:
         '.dropdown-menu.show',
     ]
 
-    @staticmethod
-    async def get_elements(page: Page) -> Dict[str, Any]:
+    def __init__(self):
+        # (url, document height) pairs whose lazy content has been scrolled in
+        self._scrolled: Set[Tuple[str, int]] = set()
+
+    def reset_scroll_state(self):
+        """Forget scrolled pages; call when starting on a new target URL."""
+        self._scrolled.clear()
+
+    async def get_elements(self, page: Page, force_scroll: bool = False) -> Dict[str, Any]:
         """
         Extract truly interactive elements.
         Returns overlay_selector — the CSS selector of whichever overlay is active.
+        The lazy-load scroll runs the first time a URL is seen at a given document
+        height (so in-page actions that grow or replace content get it again),
+        or when forced.
         """
-        await page.evaluate("""
-            async () => {
-                window.scrollTo(0, document.body.scrollHeight);
-                await new Promise(r => setTimeout(r, 500));
-                window.scrollTo(0, 0);
-                await new Promise(r => setTimeout(r, 500));
-            }
-        """)
-
-        overlay_selectors_json = json.dumps(Observer.OVERLAY_SELECTORS)
-
-        result = await page.evaluate(f"""() => {{
-            const overlaySelectors = {overlay_selectors_json};
-            const interactive = [];
-
-            const strictSelectors = {{
-                buttons:   'button',
-                links:     'a[href]',
-                inputs:    'input:not([type="hidden"])',
-                selects:   'select',
-                textareas: 'textarea',
-            }};
-
-            // ── Overlay detection ────────────────────────────────────────────
-            let activeOverlay = null;
-            let activeOverlaySelector = null;
-            let maxZIndex = -1;
-
-            for (const sel of overlaySelectors) {{
-                document.querySelectorAll(sel).forEach(overlay => {{
-                    const rect = overlay.getBoundingClientRect();
-                    if (rect.width === 0 || rect.height === 0) return;
-
-                    const style = window.getComputedStyle(overlay);
-                    if (style.display === 'none' || style.visibility === 'hidden') return;
-
-                    const zIndex = parseInt(style.zIndex) || 0;
-                    if (zIndex > maxZIndex || !activeOverlay) {{
-                        maxZIndex = zIndex;
-                        activeOverlay = overlay;
-                        activeOverlaySelector = sel;
-                    }}
-                }});
-            }}
-
-            // ── Helper: is element truly interactive? ────────────────────────
-            function isTrulyInteractive(el) {{
-                const rect = el.getBoundingClientRect();
-                if (rect.width === 0 || rect.height === 0) return false;
-
-                const style = window.getComputedStyle(el);
-                if (style.display === 'none' || style.visibility === 'hidden') return false;
-                if (style.opacity === '0') return false;
-
-                // Don't filter out disabled elements - we'll mark them as disabled instead
-                // This allows us to see submit buttons that become enabled after form fills
-                
-                const tag = el.tagName.toLowerCase();
-                const type = el.type || '';
-                if ((tag === 'input' || tag === 'textarea') &&
-                    type !== 'checkbox' && type !== 'radio' &&
-                    el.readOnly) return false;
-
-                return true;
-            }}
-            
-            // ── Helper: is element disabled? ─────────────────────────────────
-            function isDisabled(el) {{
-                if (el.disabled) return true;
-                if (el.getAttribute('aria-disabled') === 'true') return true;
-                if (el.hasAttribute('disabledinteractive') && el.classList.contains('mat-mdc-button-disabled-interactive')) return true;
-                return false;
-            }}
-
-            const seen = new Set();
-
-            // ── Collect buttons ───────────────────────────────────────────────
-            document.querySelectorAll(strictSelectors.buttons).forEach(el => {{
-                if (!isTrulyInteractive(el)) return;
-
-                const rect = el.getBoundingClientRect();
-                const isInOverlay = activeOverlay ? activeOverlay.contains(el) : false;
-                const isBlocked   = activeOverlay && !isInOverlay;
-                const disabled    = isDisabled(el);
-
-                const _clone = el.cloneNode(true);
-                _clone.querySelectorAll('mat-icon, .material-icons, svg, i.fa').forEach(function(n) {{ n.remove(); }});
-                const text = (
-                    el.getAttribute('aria-label') ||
-                    el.getAttribute('title') ||
-                    _clone.innerText ||
-                    _clone.textContent || ''
-                ).trim().replace(/\s+/g, ' ').slice(0, 150);
-
-                if (!text) return;
-
-                const contextPrefix = isInOverlay ? 'overlay:' : 'page:';
-                const key = `${{contextPrefix}}button:${{text}}:${{el.id}}`;
-                if (seen.has(key)) return;
-                seen.add(key);
-
-                interactive.push({{
-                    tag: 'button', type: el.type || 'button',
-                    role: el.getAttribute('role') || 'button',
-                    text, id: el.id || '', name: el.getAttribute('name') || '',
-                    classes: Array.from(el.classList).slice(0, 5),
-                    href: '', required: false, enabled: !disabled,
-                    blocked: isBlocked, in_overlay: isInOverlay,
-                    x: Math.round(rect.x), y: Math.round(rect.y),
-                    element_type: 'button'
-                }});
-            }});
-
-            // ── Collect links ─────────────────────────────────────────────────
-            document.querySelectorAll(strictSelectors.links).forEach(el => {{
-                if (!isTrulyInteractive(el)) return;
-
-                const rect = el.getBoundingClientRect();
-                const isInOverlay = activeOverlay ? activeOverlay.contains(el) : false;
-                const isBlocked   = activeOverlay && !isInOverlay;
-
-                const text = (
-                    el.innerText || el.textContent ||
-                    el.getAttribute('aria-label') || ''
-                ).trim().slice(0, 150);
-
-                const href = el.getAttribute('href') || '';
-                const contextPrefix = isInOverlay ? 'overlay:' : 'page:';
-                const key  = `${{contextPrefix}}link:${{text}}:${{href}}`;
-                if (seen.has(key)) return;
-                seen.add(key);
-
-                interactive.push({{
-                    tag: 'a', type: '', role: 'link',
-                    text, id: el.id || '', name: '',
-                    classes: Array.from(el.classList).slice(0, 5),
-                    href, required: false, enabled: true,
-                    blocked: isBlocked, in_overlay: isInOverlay,
-                    x: Math.round(rect.x), y: Math.round(rect.y),
-                    element_type: 'link'
-                }});
-            }});
-
-            // ── Collect inputs ────────────────────────────────────────────────
-            document.querySelectorAll(strictSelectors.inputs).forEach(el => {{
-                if (!isTrulyInteractive(el)) return;
-
-                const rect = el.getBoundingClientRect();
-                const isInOverlay = activeOverlay ? activeOverlay.contains(el) : false;
-                const isBlocked   = activeOverlay && !isInOverlay;
-
-                
-
-                const placeholder      = el.placeholder || '';
-                const ariaLabel        = el.getAttribute('aria-label') || '';
-                const nameAttr         = el.getAttribute('name') || '';
-                const formControlName  = el.getAttribute('formcontrolname') || '';
-                const id               = el.id || '';
-
-                let label = placeholder || ariaLabel || formControlName || nameAttr;
-                if (!label && id) {{
-                    const labelEl = document.querySelector(`label[for="${{id}}"]`);
-                    if (labelEl) label = labelEl.innerText.trim();
-                }}
-                if (!label) label = `${{el.type || 'text'}} input`;
-
-                const contextPrefix = isInOverlay ? 'overlay:' : 'page:';
-                const key = `${{contextPrefix}}input:${{el.type}}:${{label}}:${{id}}`;
-                if (seen.has(key)) return;
-                seen.add(key);
-
-                interactive.push({{
-                    tag: 'input', type: el.type || 'text', role: 'textbox',
-                    text: label, id, name: nameAttr,
-                    classes: Array.from(el.classList).slice(0, 5),
-                    href: '', required: el.hasAttribute('required'),
-                    enabled: true, blocked: isBlocked, in_overlay: isInOverlay,
-                    x: Math.round(rect.x), y: Math.round(rect.y),
-                    element_type: 'input',
-                    placeholder, formcontrolname: formControlName
-                }});
-            }});
-
-            // ── Collect selects ───────────────────────────────────────────────
-            document.querySelectorAll(strictSelectors.selects).forEach(el => {{
-                if (!isTrulyInteractive(el)) return;
-
-                const rect = el.getBoundingClientRect();
-                const isInOverlay = activeOverlay ? activeOverlay.contains(el) : false;
-                const isBlocked   = activeOverlay && !isInOverlay;
-
-                const label = el.getAttribute('aria-label') || el.getAttribute('name') || 'Select';
-                const formControlName = el.getAttribute('formcontrolname') || '';
-                const contextPrefix = isInOverlay ? 'overlay:' : 'page:';
-                const key   = `${{contextPrefix}}select:${{label}}:${{el.id}}`;
-                if (seen.has(key)) return;
-                seen.add(key);
-
-                interactive.push({{
-                    tag: 'select', type: '', role: 'combobox',
-                    text: label, id: el.id || '', name: el.getAttribute('name') || '',
-                    classes: Array.from(el.classList).slice(0, 5),
-                    href: '', required: el.hasAttribute('required'),
-                    enabled: true, blocked: isBlocked, in_overlay: isInOverlay,
-                    x: Math.round(rect.x), y: Math.round(rect.y),
-                    element_type: 'select',
-                    formcontrolname: formControlName
-                }});
-            }});
-
-            // ── Collect textareas ─────────────────────────────────────────────
-            document.querySelectorAll(strictSelectors.textareas).forEach(el => {{
-                if (!isTrulyInteractive(el)) return;
-
-                const rect = el.getBoundingClientRect();
-                const isInOverlay = activeOverlay ? activeOverlay.contains(el) : false;
-                const isBlocked   = activeOverlay && !isInOverlay;
-
-                const placeholder     = el.placeholder || '';
-                const ariaLabel       = el.getAttribute('aria-label') || '';
-                const nameAttr        = el.getAttribute('name') || '';
-                const formControlName = el.getAttribute('formcontrolname') || '';
-                const id              = el.id || '';
-
-                let label = placeholder || ariaLabel || formControlName || nameAttr;
-                if (!label && id) {{
-                    const labelEl = document.querySelector(`label[for="${{id}}"]`);
-                    if (labelEl) label = labelEl.innerText.trim();
-                }}
-                if (!label) label = 'textarea';
-
-                const contextPrefix = isInOverlay ? 'overlay:' : 'page:';
-                const key = `${{contextPrefix}}textarea:${{label}}:${{id}}`;
-                if (seen.has(key)) return;
-                seen.add(key);
-
-                interactive.push({{
-                    tag: 'textarea', type: '', role: 'textbox',
-                    text: label, id, name: nameAttr,
-                    classes: Array.from(el.classList).slice(0, 5),
-                    href: '', required: el.hasAttribute('required'),
-                    enabled: true, blocked: isBlocked, in_overlay: isInOverlay,
-                    x: Math.round(rect.x), y: Math.round(rect.y),
-                    element_type: 'textarea',
-                    placeholder, formcontrolname: formControlName
-                }});
-            }});
-
-            // ── Collect ARIA interactive elements (tabs, custom buttons) ──────
-            const ariaSelectors = [
-    '[role="tab"]',
-    '[role="button"]:not(button)',
-    '[role="menuitem"]:not(button):not(a)',
-    '[tabindex="0"]:not(button):not(a):not(input):not(select):not(textarea)',
-];
-            ariaSelectors.forEach(sel => {{
-                document.querySelectorAll(sel).forEach(el => {{
-                    if (!isTrulyInteractive(el)) return;
-
-                    const rect = el.getBoundingClientRect();
-                    const isInOverlay = activeOverlay ? activeOverlay.contains(el) : false;
-                    const isBlocked   = activeOverlay && !isInOverlay;
-
-                    const text = (
-                        el.getAttribute('aria-label') ||
-                        el.getAttribute('title') ||
-                        el.innerText ||
-                        el.textContent || ''
-                    ).trim().replace(/\s+/g, ' ').slice(0, 150);
-
-                    if (!text) return;
-
-                    const contextPrefix = isInOverlay ? 'overlay:' : 'page:';
-                    const key = `${{contextPrefix}}aria:${{text}}:${{el.id}}`;
-                    if (seen.has(key)) return;
-                    seen.add(key);
-
-                    interactive.push({{
-                        tag: el.tagName.toLowerCase(),
-                        type: el.getAttribute('role') || 'button',
-                        role: el.getAttribute('role') || 'button',
-                        text, id: el.id || '', name: el.getAttribute('name') || '',
-                        classes: Array.from(el.classList).slice(0, 5),
-                        href: el.getAttribute('href') || '',
-                        required: false, enabled: !isDisabled(el),
-                        blocked: isBlocked, in_overlay: isInOverlay,
-                        x: Math.round(rect.x), y: Math.round(rect.y),
-                        element_type: el.getAttribute('role') || 'button'
-                    }});
-                }});
-            }});
-
-            // ── Collect CUSTOM SELECT components ──────────────────────────────
-            const customSelectSelectors = [
-                '[role="combobox"]:not(input):not(select)',
-                '[role="listbox"]:not(select)',
-                'mat-select',
-                'p-dropdown .p-dropdown',
-                'p-multiselect .p-multiselect',
-                '.ant-select-selector',
-                'ng-select',
-                '.vs__dropdown-toggle',
-                '.react-select__control',
-                '.v-select__slot',
-            ];
-
-            function getCustomLabel(el) {{
-                let label = el.getAttribute('aria-label') || '';
-                if (label) return label;
-
-                label = el.getAttribute('formcontrolname') || '';
-                if (label) return label;
-
-                const labelledBy = el.getAttribute('aria-labelledby') || '';
-                if (labelledBy) {{
-                    const lbl = document.getElementById(labelledBy);
-                    if (lbl) return lbl.innerText.trim();
-                }}
-
-                let node = el.parentElement;
-                for (let i = 0; i < 4 && node; i++) {{
-                    const lbl = node.querySelector('label');
-                    if (lbl && lbl.innerText.trim()) return lbl.innerText.trim();
-                    const matLabel = node.querySelector('mat-label');
-                    if (matLabel && matLabel.innerText.trim()) return matLabel.innerText.trim();
-                    node = node.parentElement;
-                }}
-
-                const placeholder = el.querySelector(
-                    '.mat-mdc-select-placeholder, .p-placeholder, ' +
-                    '.ant-select-selection-placeholder, .vs__placeholder, ' +
-                    '[class*="placeholder"]'
-                );
-                if (placeholder && placeholder.innerText.trim())
-                    return placeholder.innerText.trim();
-
-                label = el.getAttribute('name') || '';
-                if (label) return label;
-
-                label = el.id || '';
-                if (label) return label;
-
-                return 'custom-select';
-            }}
-
-            function isCustomSelectDisabled(el) {{
-                if (el.getAttribute('aria-disabled') === 'true') return true;
-                if (el.hasAttribute('disabled')) return true;
-                if (el.classList.contains('mat-mdc-select-disabled')) return true;
-                if (el.classList.contains('mat-select-disabled')) return true;
-                if (el.classList.contains('p-disabled')) return true;
-                if (el.classList.contains('ant-select-disabled')) return true;
-                return false;
-            }}
-
-            const seenCustom = new Set();
-            const seenFormControls = new Set();  // Track formcontrolnames separately
-
-            customSelectSelectors.forEach(sel => {{
-                let elements;
-                try {{ elements = document.querySelectorAll(sel); }}
-                catch(e) {{ return; }}
-
-                elements.forEach(el => {{
-                    const rect = el.getBoundingClientRect();
-                    if (rect.width === 0 || rect.height === 0) return;
-                    const style = window.getComputedStyle(el);
-                    if (style.display === 'none' || style.visibility === 'hidden') return;
-                    if (style.opacity === '0') return;
-
-                    if (isCustomSelectDisabled(el)) return;
-
-                    const isInOverlay = activeOverlay ? activeOverlay.contains(el) : false;
-                    const isBlocked   = activeOverlay && !isInOverlay;
-
-                    const label          = getCustomLabel(el);
-                    const formcontrol    = el.getAttribute('formcontrolname') || '';
-                    const id             = el.id || '';
-                    const required       = el.hasAttribute('required') ||
-                                        el.getAttribute('aria-required') === 'true';
-
-                    const contextPrefix = isInOverlay ? 'overlay:' : 'page:';
-
-                    // FIX: Prioritize formcontrolname for deduplication
-                    // If element has formcontrolname, that's the primary key
-                    let dedupKey;
-                    if (formcontrol) {{
-                        dedupKey = `${{contextPrefix}}formcontrol:${{formcontrol}}`;
-                        // Also track formcontrolname separately
-                        if (seenFormControls.has(formcontrol)) return;
-                        seenFormControls.add(formcontrol);
-                    }} else {{
-                        dedupKey = `${{contextPrefix}}customselect:${{id || label}}`;
-                    }}
-                    
-                    if (seenCustom.has(dedupKey)) return;
-                    seenCustom.add(dedupKey);
-
-                    // Skip if native <select> with same formcontrolname already collected
-                    if (formcontrol && seen.has(`${{contextPrefix}}select::${{formcontrol}}`)) return;
-                    
-                    const nativeKey = `${{contextPrefix}}select::${{label}}:${{id}}`;
-                    if (seen.has(nativeKey)) return;
-
-                    interactive.push({{
-                        tag: el.tagName.toLowerCase(),
-                        type: 'custom-select',
-                        role: el.getAttribute('role') || 'combobox',
-                        text: label,
-                        id,
-                        name: el.getAttribute('name') || '',
-                        classes: Array.from(el.classList).slice(0, 5),
-                        href: '',
-                        required,
-                        enabled: true,
-                        blocked: isBlocked,
-                        in_overlay: isInOverlay,
-                        x: Math.round(rect.x),
-                        y: Math.round(rect.y),
-                        element_type: 'custom-select',
-                        placeholder: '',
-                        formcontrolname: formcontrol
-                    }});
-                }});
-            }});
-
-            // ── Overlay type ──────────────────────────────────────────────────
-            let overlayType = null;
-            let widgetType = null;
-            if (activeOverlay) {{
-                const isCalendar = activeOverlay.querySelector(
-                    'mat-calendar, [class*="mat-calendar"], [class*="datepicker-calendar"]'
-                );
-                if (isCalendar) {{
-                    overlayType = 'widget';
-                    widgetType  = 'calendar';
-                }} else {{
-
-                    const txt = activeOverlay.innerText.toLowerCase();
-                    if (txt.includes('confirm') || txt.includes('yakin') || txt.includes('are you sure'))
-                        overlayType = 'confirmation';
-                    else if (activeOverlay.querySelector(
-                        'input, select, textarea, mat-select, ng-select, ' +
-                        '[role="combobox"], [formcontrolname]'
-                    ))
-                        overlayType = 'form';
-                    else
-                        overlayType = 'info';
-                }}
-
-                }}
-
-            return {{
-                has_overlay:       !!activeOverlay,
-                overlay_type:      overlayType,
-                widget_type:       widgetType,  
-                overlay_selector:  activeOverlaySelector,
-                active_elements:   interactive.filter(e => !e.blocked),
-                blocked_elements:  interactive.filter(e => e.blocked),
-                total_discovered:  interactive.length
-            }};
-        }}""")
-
+        scroll_key = (page.url, await page.evaluate("() => document.body.scrollHeight"))
+        if force_scroll or scroll_key not in self._scrolled:
+            await page.evaluate(_LAZY_LOAD_SCROLL_JS)
+            self._scrolled.add(scroll_key)
+
+        if page not in _pages_with_collector:
+            await page.add_init_script(script=_GET_ELEMENTS_JS)
+            _pages_with_collector.add(page)
+
+        result = await page.evaluate(_CALL_GET_ELEMENTS_JS, Observer.OVERLAY_SELECTORS)
+        if result is None:
+            # Current document predates the init script: install and call
+            result = await page.evaluate(_INSTALL_GET_ELEMENTS_JS, Observer.OVERLAY_SELECTORS)
+
+        # Each element is shipped once; split into active/blocked in one pass here
+        result = orjson.loads(result)
+        active, blocked = [], []
+        for e in result.pop('elements'):
+            (blocked if e['blocked'] else active).append(e)
+        result['active_elements'] = active
+        result['blocked_elements'] = blocked
         return result
 
     @staticmethod
@@ -532,17 +628,17 @@ class Observer:
             e.get('element_type') == 'custom-select'
             for e in active
         )
-        has_submit = any(
-            any(kw in e.get('text', '').lower() for kw in
-                ['submit', 'save', 'simpan', 'tambah', 'perbarui', 'update'])
-            for e in active
-        )
+        has_submit = any(_SUBMIT_RE.search(e.get('text', '')) for e in active)
         if has_inputs and has_submit:
             return ContextType.FORM
 
-        has_table = await page.evaluate(
-            "() => document.querySelectorAll('table, .table, [role=grid]').length > 0"
-        )
+        # Collected in the same evaluate as the elements; only older results
+        # without the flag cost a second round-trip
+        has_table = elements_data.get('has_table')
+        if has_table is None:
+            has_table = await page.evaluate(
+                "() => document.querySelectorAll('table, .table, [role=grid]').length > 0"
+            )
         if has_table:
             return ContextType.TABLE
 
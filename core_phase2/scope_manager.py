@@ -1,42 +1,26 @@
-import asyncio
-import json
-import base64
-import hashlib
-from pathlib import Path
-from datetime import datetime
-from typing import Optional, Dict, List, Any, Tuple, Set
+import re
+import sys
+from typing import Dict, Tuple
 from urllib.parse import urlparse, urljoin
-from dataclasses import dataclass, field
-from enum import Enum
+from functools import lru_cache
 
-from playwright.async_api import async_playwright, Page, Locator, FrameLocator
-from openai import OpenAI
 
+# Substring match over the joined class list, as before, in one pass
+_NAV_CLASS_RE = re.compile(r'sidebar|sidenav|menu-item|nav-link', re.IGNORECASE)
+_NAV_TEXTS = frozenset(('halaman utama', 'dashboard', 'home', 'beranda'))
 
-class ContextType(Enum):
-    PAGE = "page"
-    MODAL = "modal"
-    FORM = "form"
-    DROPDOWN = "dropdown"
-    TABLE = "table"
-    CONFIRMATION = "confirmation"
 
-
-@dataclass
-class ContextFrame:
-    context_type: ContextType
-    description: str
-    timestamp: str
-    url: str
-    dom_hash: str
-    overlay_selector: Optional[str] = None
+@lru_cache(maxsize=4096)
+def _resolved_path(current_url: str, href: str) -> str:
+    """Path of href resolved against current_url; pages repeat the same links every step"""
+    return sys.intern(urlparse(urljoin(current_url, href)).path)
 
 
 class ScopeManager:
     def __init__(self, target_url: str):
         self.target_url = target_url
         parsed = urlparse(target_url)
-        self.target_path = parsed.path
+        self.target_path = sys.intern(parsed.path)
         self.base_domain = f"{parsed.scheme}://{parsed.netloc}"
 
         print(f"🎯 Focused Testing Mode:")
@@ -45,24 +29,21 @@ class ScopeManager:
         print(f"   Will ONLY test elements on this page\n")
 
     def is_element_in_scope(self, element: Dict, current_url: str) -> Tuple[bool, str]:
-        tag = element.get('tag', '')
-        href = element.get('href', '')
-        text = element.get('text', '').strip()
-        classes = ' '.join(element.get('classes', [])).lower()
+        # Every out-of-scope rule below is about links
+        if element.get('tag', '') != 'a':
+            return True, "In scope"
 
-        if tag == 'a' and href:
-            absolute_url = urljoin(current_url, href)
-            target_path = urlparse(absolute_url).path
+        href = element.get('href', '')
+        if href:
+            target_path = _resolved_path(current_url, href)
             if target_path != self.target_path:
                 return False, f"Navigation link to different page: {target_path}"
 
-        nav_indicators = ['sidebar', 'sidenav', 'menu-item', 'nav-link']
-        if any(indicator in classes for indicator in nav_indicators):
-            if tag == 'a':
-                return False, "Sidebar/menu navigation link"
+        if _NAV_CLASS_RE.search(' '.join(element.get('classes', []))):
+            return False, "Sidebar/menu navigation link"
 
-        nav_texts = ['halaman utama', 'dashboard', 'home', 'beranda']
-        if text.lower() in nav_texts and tag == 'a':
+        text = element.get('text', '').strip()
+        if text.lower() in _NAV_TEXTS:
             return False, f"Navigation link: {text}"
 
         return True, "In scope"
@@ -0,0 +1,22 @@
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional
+
+
+class ContextType(str, Enum):
+    PAGE = "page"
+    MODAL = "modal"
+    FORM = "form"
+    DROPDOWN = "dropdown"
+    TABLE = "table"
+    CONFIRMATION = "confirmation"
+
+
+@dataclass(slots=True)
+class ContextFrame:
+    context_type: ContextType
+    description: str
+    timestamp: str
+    url: str
+    dom_hash: str
+    overlay_selector: Optional[str] = None
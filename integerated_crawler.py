@@ -279,14 +279,15 @@ class TwoTierCrawler:
 
         await asyncio.sleep(2)
         current_url = page.url
-        state_hash  = await self.state_manager.calculate_state_hash(page)
+        # Hash first: visited states and vision-cache hits never need a screenshot
+        state_hash = await self.state_manager.calculate_state_hash(page)
 
         if self.state_manager.is_state_visited(state_hash):
             console.print("[yellow]♻️ State already visited, skipping[/yellow]")
             return
 
         console.print("\n[bold yellow]🔍 INITIAL SCAN: Understanding page structure...[/bold yellow]")
-        vision_analysis = await self.vision.analyze_page(page, current_url)
+        vision_analysis = await self.vision.analyze_page(page, current_url, state_hash)
         self.stats["vision_calls"] += 1
 
         containers = await self.component_detector.detect_containers(
@@ -502,7 +503,7 @@ class TwoTierCrawler:
                 "session_dir": str(self.logger.session_dir)
             },
             "knowledge_graph": {
-                "nodes": self.knowledge_graph.nodes,
+                "nodes": self.knowledge_graph.nodes_as_dicts(),
                 "edges": self.knowledge_graph.edges,
                 "paths": self.knowledge_graph.paths
             },
@@ -548,7 +549,7 @@ class SemanticTester:
         self.observer       = Observer()
         self.context_stack  = ContextStack()
         self.loop_detector  = LoopDetector()
-        self.global_memory  = GlobalMemory()
+        self.global_memory  = GlobalMemory(self.output_dir / f"{self.session_id}_tested_actions.ndjson")
         self.element_filter = ElementFilter(self.openai)
 
         self.scope:      Optional[ScopeManager]      = None
@@ -645,7 +646,9 @@ class SemanticTester:
         self.scope         = ScopeManager(target_url)
         self.context_stack = ContextStack()
         self.loop_detector = LoopDetector()
-        self.global_memory = GlobalMemory()
+        self.observer.reset_scroll_state()
+        self.global_memory.close()
+        self.global_memory = GlobalMemory(self.output_dir / f"{self.session_id}_tested_actions.ndjson")
 
         await page.goto(target_url, wait_until="networkidle", timeout=30000)
         await asyncio.sleep(2)
@@ -719,8 +722,10 @@ class SemanticTester:
                         value={"start": start_val, "end": end_val}
                     )
 
+                    self.global_memory.mark_tested_batch(
+                        [(("page", "input", field), "fill") for field in ("start", "end")]
+                    )
                     for field in ["start", "end"]:
-                        self.global_memory.mark_tested(f"page:input:{field}", "fill")
                         print(f"  ✅ Marked as tested: page:input:{field}")
 
                     continue  # skip rest of loop iteration
@@ -846,7 +851,8 @@ class SemanticTester:
             matching_elem = self._find_matching_elem(untested, scoped_elements, decision)
 
             locator, method = await self.controller.find(
-                decision, overlay_selector=current.overlay_selector
+                decision, overlay_selector=current.overlay_selector,
+                dom_hash=current.dom_hash
             )
 
             if not locator:
@@ -316,7 +316,7 @@ class TwoTierCrawler:
         console.print("URL before screenshot:", page.url)
         await self._screenshot(page, f"scan_depth{depth}_{self.step}")
         console.print("URL after screenshot:", page.url)
-        vision_analysis = await self.vision.analyze_page(page, current_url)
+        vision_analysis = await self.vision.analyze_page(page, current_url, state_hash)
         self.stats['vision_calls'] += 1
 
         containers = await self.component_detector.detect_containers(
@@ -738,16 +738,13 @@ class TwoTierCrawler:
                 'session_directory': str(self.logger.session_dir)
             },
             'knowledge_graph': {
-                'nodes': self.knowledge_graph.nodes,
+                'nodes': self.knowledge_graph.nodes_as_dicts(),
                 'edges': self.knowledge_graph.edges,
                 'paths': self.knowledge_graph.paths
             },
             'assumption_plan': self.planner.assumption_plan,
             'main_action_plan': self.planner.main_action_plan,
-            'states': {
-                h: {k: v for k, v in s.items()}
-                for h, s in self.state_manager.states.items()
-            }
+            'states': self.state_manager.states_as_dicts()
         }
 
         output_file = output_dir / f'kg_exploration_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json'
@@ -48,7 +48,7 @@ class SemanticTester:
         self.observer      = Observer()
         self.context_stack = ContextStack()
         self.loop_detector = LoopDetector()
-        self.global_memory = GlobalMemory()
+        self.global_memory = GlobalMemory(self.output_dir / f"{self.session_id}_tested_actions.ndjson")
         self.element_filter = ElementFilter(self.openai)
         self.scope:      Optional[ScopeManager] = None
         self.decider:    Optional[Decider]      = None
@@ -179,8 +179,10 @@ class SemanticTester:
                     )
 
                     # Mark both start and end as tested
+                    self.global_memory.mark_tested_batch(
+                        [(("page", "input", field), "fill") for field in ("start", "end")]
+                    )
                     for field in ["start", "end"]:
-                        self.global_memory.mark_tested(f"page:input:{field}", "fill")
                         print(f"  ✅ Marked as tested: page:input:{field}")
 
                     continue  # Skip rest of loop, go to next iteration
@@ -364,7 +366,8 @@ class SemanticTester:
 
             locator, method = await self.controller.find(
                 decision,
-                overlay_selector=current.overlay_selector
+                overlay_selector=current.overlay_selector,
+                dom_hash=current.dom_hash
             )
 
             if not locator:
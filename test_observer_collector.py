@@ -0,0 +1,81 @@
+import asyncio
+
+from playwright.async_api import async_playwright
+
+from core_phase2.observer import Observer
+
+
+FORM_HTML = """
+<html><body>
+    <label for="name">Name</label>
+    <input id="name" type="text">
+    <button type="submit">Save</button>
+    <table><tr><td>row</td></tr></table>
+</body></html>
+"""
+
+# A dialog mid fade-in: the container is still at opacity 0, its controls are not
+FADING_DIALOG_HTML = """
+<html><body>
+    <button>Open</button>
+    <div role="dialog" aria-modal="true" style="opacity: 0; width: 300px; height: 200px;">
+        <input id="qty" type="number" placeholder="Qty">
+        <button>Confirm order</button>
+    </div>
+</body></html>
+"""
+
+
+async def _observe(html: str):
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        page = await browser.new_page()
+        await page.set_content(html)
+        result = await Observer().get_elements(page)
+        await browser.close()
+        return result
+
+
+async def _observe_fresh_document():
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        page = await browser.new_page()
+
+        # Content is loaded before the observer registers its init script,
+        # so the first observation has to go through the install path
+        await page.set_content(FORM_HTML)
+        first = await Observer().get_elements(page)
+        second = await Observer().get_elements(page)
+
+        await browser.close()
+        return first, second
+
+
+def test_install_path_returns_elements():
+    """The first observation of an already-loaded document returns a result"""
+    first, second = asyncio.run(_observe_fresh_document())
+
+    for result in (first, second):
+        assert result['has_overlay'] is False
+        assert result['has_table'] is True
+        tags = [e['tag'] for e in result['active_elements']]
+        assert 'input' in tags
+        assert 'button' in tags
+
+
+def test_fading_dialog_keeps_its_controls():
+    """Controls inside an overlay that is still fading in stay actionable"""
+    result = asyncio.run(_observe(FADING_DIALOG_HTML))
+
+    assert result['has_overlay'] is True
+    texts = [e.get('text', '') for e in result['active_elements']]
+    tags = [e['tag'] for e in result['active_elements']]
+    assert any('Confirm order' in t for t in texts)
+    assert 'input' in tags
+
+
+if __name__ == "__main__":
+    test_install_path_returns_elements()
+    print("✅ Observer install path returns elements")
+    test_fading_dialog_keeps_its_controls()
+    print("✅ Fading-in dialog keeps its controls")